@@ -0,0 +1,158 @@
+#
+# This sample code runs the researcher crew from client.py over a file of
+# questions, with a bounded number of kickoffs in flight against Llama Stack
+#
+
+import argparse
+import csv
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import openai
+
+from client import build_crew, build_llm
+from llm_cache import ResponseStore
+
+
+def read_questions(path, field):
+    '''
+    Stream (id, question) pairs from a JSONL, CSV or plain text file (one
+    question per line) without loading the whole file.
+    '''
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(f)
+        elif path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = ({field: line.strip()} for line in f if line.strip())
+
+        for row_number, row in enumerate(rows):
+            yield str(row.get("id", row_number)), row[field]
+
+
+def percentile(cut_points, p):
+    return cut_points[p - 1] if cut_points else 0.0
+
+
+def is_transient(error):
+    '''
+    Connection errors, timeouts, rate limits and server errors are worth a
+    retry; anything else (bad request, auth, a bug) fails the question.
+    litellm's exceptions subclass the openai ones.
+    '''
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def kickoff(llm, question, retries, backoff):
+    '''
+    Run one crew for a question, retrying kickoffs that failed with a
+    transient error with jittered exponential backoff. Returns (answer,
+    attempts, seconds).
+    '''
+    if retries < 0:
+        raise ValueError(f"retries must be >= 0, got {retries}")
+    started = time.perf_counter()
+    for attempt in range(1, retries + 2):
+        try:
+            result = build_crew(llm).kickoff(inputs={"question": question})
+            return result.raw, attempt, time.perf_counter() - started
+        except Exception as e:
+            if attempt > retries or not is_transient(e):
+                raise
+            delay = backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            print(f"Kickoff failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def batch_kickoff(args):
+    # Each worker gets its own LLM (crewai mutates llm.stop and the cache
+    # counters are not locked); they all share the thread-safe store
+    store = ResponseStore()
+    llms = []
+    worker = threading.local()
+    latencies = []
+    failed = 0
+    write_lock = threading.Lock()
+
+    def init_worker():
+        worker.llm = build_llm(store)
+        with write_lock:
+            llms.append(worker.llm)
+
+    def run(question):
+        return kickoff(worker.llm, question, args.retries, args.backoff)
+
+    with open(args.output, "a", encoding="utf-8") as output, \
+            ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="kickoff",
+                               initializer=init_worker) as executor:
+
+        # Keep at most two kickoffs queued per worker so huge inputs stay streamed
+        slots = threading.BoundedSemaphore(args.concurrency * 2)
+
+        def record(question_id, question, future):
+            # Runs as soon as the kickoff finishes, so a crash loses no completed result
+            nonlocal failed
+            row = {"id": question_id, "question": question}
+            try:
+                answer, attempts, latency = future.result()
+                row.update(answer=answer, attempts=attempts, latency_s=round(latency, 3))
+            except Exception as e:
+                row["error"] = str(e)
+            with write_lock:
+                if "error" in row:
+                    failed += 1
+                else:
+                    latencies.append(latency)
+                output.write(json.dumps(row) + "\n")
+                output.flush()
+            slots.release()
+
+        started = time.perf_counter()
+        for question_id, question in read_questions(args.input, args.field):
+            slots.acquire()
+            future = executor.submit(run, question)
+            future.add_done_callback(lambda f, question_id=question_id, question=question:
+                                     record(question_id, question, f))
+
+    # Leaving the executor waited for every kickoff and its record()
+    elapsed = time.perf_counter() - started
+
+    completed = len(latencies)
+    print(f"Completed {completed} kickoffs ({failed} failed) in {elapsed:.2f}s "
+          f"({completed / elapsed if elapsed else 0:.2f} kickoffs/s, concurrency={args.concurrency})")
+    if completed > 1:
+        cut_points = statistics.quantiles(latencies, n=100, method="inclusive")
+        print(f"Kickoff latency p50={percentile(cut_points, 50):.2f}s "
+              f"p95={percentile(cut_points, 95):.2f}s "
+              f"p99={percentile(cut_points, 99):.2f}s max={max(latencies):.2f}s")
+    cache_stats = {name: sum(llm.cache_stats[name] for llm in llms) for name in ("hits", "misses", "bypassed")}
+    print(f"LLM cache: {cache_stats}")
+    print(f"Results written to {args.output}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the researcher crew over a file of questions")
+    parser.add_argument("input", help="JSONL, CSV or text file of questions")
+    parser.add_argument("--output", default="answers.jsonl", help="JSONL file for results")
+    parser.add_argument("--field", default="question", help="Column/key that holds the question")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Kickoffs in flight; match the Llama Stack inference parallelism")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--backoff", type=float, default=1.0, help="Initial retry delay in seconds")
+    args = parser.parse_args()
+    if args.retries < 0:
+        parser.error("--retries must be >= 0")
+    return args
+
+
+if __name__ == "__main__":
+    batch_kickoff(parse_args())
@@ -2,42 +2,64 @@
 # This file provides a sample client that connects to a local Llama Stack instance
 #
 
-from crewai import LLM, Agent, Task, Crew
-
-llm = LLM(
-    model="meta_llama/ollama/llama3.2:3b",
-    base_url="http://localhost:8321/v1/openai/v1",
-    api_key="some-key" # key not required
-)
-
-messages = [
-    {"role": "system", "content": "You are a helpful assistant."},
-    {"role": "user", "content": "Write a two sentence poem about CrewAI."}
-]
-
-print("Testing llm call to llama3.2:3b:")
-response = llm.call(messages)
-print(response)
-print("-" * 10)
-
-researcher = Agent(
-    role="About LLM",
-    goal="You know everything about LLM.",
-    backstory="""You are a master at LLMs and their safety issues.""",
-    llm=llm,
-)
-
-search = Task(
-    description="Answer the following questions about LLMs: {question}",
-    expected_output="An answer to the question.",
-    agent=researcher,
-)
-
-crew = Crew(agents=[researcher], tasks=[search])
-
-result = crew.kickoff(
-    inputs={"question": "What is the latest on LLM and guardrails?"}
-)
-
-print("Testing crewai agent and task execution:")
-print(result)
+from crewai import Agent, Task, Crew
+
+from llm_cache import CachedLLM, ResponseStore
+
+
+def build_llm(cache_store=None):
+    # Deterministic sampling so repeated runs are answered from the on-disk cache.
+    # Pass a shared ResponseStore to give several LLMs one cache
+    return CachedLLM(
+        model="meta_llama/ollama/llama3.2:3b",
+        base_url="http://localhost:8321/v1/openai/v1",
+        api_key="some-key", # key not required
+        temperature=0,
+        cache_store=cache_store or ResponseStore(),
+    )
+
+
+def build_crew(llm):
+    '''
+    Build the researcher crew. Crews keep per-run state, so concurrent
+    kickoffs each need their own crew. They also need their own LLM, since
+    crewai sets llm.stop during a run; LLMs can share one ResponseStore.
+    '''
+    researcher = Agent(
+        role="About LLM",
+        goal="You know everything about LLM.",
+        backstory="""You are a master at LLMs and their safety issues.""",
+        llm=llm,
+    )
+
+    search = Task(
+        description="Answer the following questions about LLMs: {question}",
+        expected_output="An answer to the question.",
+        agent=researcher,
+    )
+
+    return Crew(agents=[researcher], tasks=[search])
+
+
+if __name__ == "__main__":
+    llm = build_llm()
+
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": "Write a two sentence poem about CrewAI."}
+    ]
+
+    print("Testing llm call to llama3.2:3b:")
+    response = llm.call(messages)
+    print(response)
+    print("-" * 10)
+
+    crew = build_crew(llm)
+
+    result = crew.kickoff(
+        inputs={"question": "What is the latest on LLM and guardrails?"}
+    )
+
+    print("Testing crewai agent and task execution:")
+    print(result)
+    print(f"LLM cache: {llm.cache_stats}")
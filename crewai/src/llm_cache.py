@@ -0,0 +1,141 @@
+#
+# This file provides a crewai LLM that caches responses on disk, so re-running
+# a crew with unchanged prompts skips inference against Llama Stack
+#
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from crewai import LLM
+
+CACHE_DIR = os.environ.get("CREWAI_LLM_CACHE_DIR", "~/.cache/llama-stack-examples")
+DB_PATH = os.path.join(os.path.expanduser(CACHE_DIR), "crewai_llm_cache.db")
+
+# Request fields that change the completion for a given prompt
+SAMPLING_FIELDS = (
+    "temperature", "top_p", "n", "stop", "max_tokens", "max_completion_tokens",
+    "presence_penalty", "frequency_penalty", "logit_bias", "seed", "reasoning_effort",
+    "logprobs", "top_logprobs",
+)
+
+
+class ResponseStore:
+    '''
+    SQLite store of zlib-compressed responses. When the stored bytes exceed
+    max_bytes, the least recently used entries are evicted.
+    '''
+
+    def __init__(self, db_path=DB_PATH, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.db.commit()
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+            return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, key, value):
+        blob = zlib.compress(value.encode("utf-8"), 6)
+        with self.lock:
+            old = self.db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self.total_bytes += len(blob) - (old[0] if old else 0)
+            self._evict()
+            self.db.commit()
+
+    def _evict(self):
+        evicted = 0
+        while self.total_bytes > self.max_bytes:
+            rows = self.db.execute(
+                "SELECT key, size FROM responses ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.total_bytes -= size
+                evicted += 1
+        return evicted
+
+
+class CachedLLM(LLM):
+    '''
+    Drop-in replacement for crewai.LLM that answers repeated calls from an
+    on-disk cache. The key is a canonical hash of the model, endpoint,
+    messages, tools and sampling parameters.
+
+    Only deterministic calls (temperature 0) are cached unless
+    cache_nondeterministic=True; set CREWAI_LLM_CACHE=0 to bypass the cache.
+    Calls that pass available_functions are never cached, since their result
+    comes from running a tool.
+    '''
+
+    def __init__(self, *args, cache_store=None, cache_nondeterministic=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_store = cache_store
+        self.cache_nondeterministic = cache_nondeterministic
+        self.cache_stats = {"hits": 0, "misses": 0, "bypassed": 0}
+
+    def _cache_enabled(self, available_functions):
+        if os.getenv("CREWAI_LLM_CACHE", "1").strip() == "0" or available_functions:
+            return False
+        return self.cache_nondeterministic or self.temperature == 0
+
+    def cache_key(self, messages, tools):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        response_format = self.response_format
+        if response_format is not None and hasattr(response_format, "model_json_schema"):
+            response_format = response_format.model_json_schema()
+
+        material = {
+            "model": self.model,
+            "base_url": self.base_url or self.api_base,
+            "messages": messages,
+            "tools": tools,
+            "response_format": response_format,
+            "params": {field: getattr(self, field, None) for field in SAMPLING_FIELDS},
+            "additional_params": self.additional_params,
+        }
+        canonical = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        if self.cache_store is None or not self._cache_enabled(available_functions):
+            self.cache_stats["bypassed"] += 1
+            return super().call(messages, tools, callbacks, available_functions, **kwargs)
+
+        key = self.cache_key(messages, tools)
+        cached = self.cache_store.get(key)
+        if cached is not None:
+            self.cache_stats["hits"] += 1
+            return cached
+
+        self.cache_stats["misses"] += 1
+        response = super().call(messages, tools, callbacks, available_functions, **kwargs)
+        if isinstance(response, str):
+            self.cache_store.put(key, response)
+        return response
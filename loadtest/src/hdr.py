@@ -0,0 +1,87 @@
+"""
+Pure-Python HDR (high dynamic range) latency histogram.
+
+Values are recorded as integers (microseconds in the load generator) into log-linear buckets:
+each power-of-two range is split into the same number of linear sub-buckets, so every recorded
+value is kept with a bounded relative error (about 0.1% for 3 significant digits) while the
+whole range from 1us to an hour fits in a few tens of thousands of counters. This is the layout
+used by HdrHistogram, so percentiles up to p99.9 are exact to within that error no matter how
+many values are recorded.
+"""
+
+import math
+from array import array
+
+
+class HdrHistogram:
+    def __init__(self, highest_value=3_600_000_000, significant_digits=3):
+        # Enough linear sub-buckets per power of two to resolve significant_digits
+        largest_single_unit = 2 * 10 ** significant_digits
+        self.sub_bucket_half_magnitude = math.ceil(math.log2(largest_single_unit)) - 1
+        self.sub_bucket_half_count = 1 << self.sub_bucket_half_magnitude
+        self.sub_bucket_count = self.sub_bucket_half_count * 2
+        self.sub_bucket_mask = self.sub_bucket_count - 1
+
+        bucket_count = max(1, highest_value.bit_length() - self.sub_bucket_half_magnitude)
+        self.highest_value = highest_value
+        self.counts = array("q", bytes(8 * (bucket_count + 1) * self.sub_bucket_half_count))
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        bucket = max(0, value.bit_length() - self.sub_bucket_half_magnitude - 1)
+        sub_bucket = value >> bucket
+        return ((bucket + 1) << self.sub_bucket_half_magnitude) + sub_bucket - self.sub_bucket_half_count
+
+    def _value_range(self, index):
+        """
+        Lowest and highest value counted at index.
+        """
+        bucket = (index >> self.sub_bucket_half_magnitude) - 1
+        sub_bucket = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket < 0:
+            sub_bucket -= self.sub_bucket_half_count
+            bucket = 0
+        low = sub_bucket << bucket
+        return low, low + (1 << bucket) - 1
+
+    def record(self, value, count=1):
+        value = min(max(int(value), 0), self.highest_value)
+        self.counts[self._index(value)] += count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def value_at_percentile(self, percentile):
+        """
+        Highest value (within the histogram's precision) below which percentile% of the
+        recorded values fall.
+        """
+        if not self.total:
+            return 0
+        target = max(1, math.ceil(self.total * percentile / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._value_range(index)[1], self.max)
+        return self.max
+
+    def percentiles(self, percentiles=(50, 90, 99, 99.9)):
+        return {p: self.value_at_percentile(p) for p in percentiles}
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
@@ -0,0 +1,331 @@
+"""
+Maintenance and retention for the SQLite stores configured in run.yaml.
+
+responses_store.db holds the openai_responses table (one row per stored response, with the full
+response and its input as JSON) and agents_store.db holds the agents kvstore (agents, sessions,
+turns). Neither is ever pruned by the server, so both grow with traffic, and listing responses
+sorts the whole table because there is no index on created_at.
+
+Subcommands:
+
+    analyze   table sizes, row counts and the query plans of the Responses API lookups
+    index     add indexes for those lookups and refresh the planner statistics
+    prune     delete old responses or agent sessions in small batches
+    wal       switch to write-ahead logging and checkpoint the WAL file
+    bench     time retrieve and list queries (run before and after index)
+    seed      create a synthetic responses store for trying the above
+
+Run it from the maintenance directory with the server running or stopped; every write happens
+in short transactions, so the server never waits for long on the database lock.
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+STORE_DIR = os.path.expanduser(os.environ.get("SQLITE_STORE_DIR", "~/.llama/distributions/custom"))
+RESPONSES_DB = os.path.join(STORE_DIR, "responses_store.db")
+AGENTS_DB = os.path.join(STORE_DIR, "agents_store.db")
+
+# Indexes for the list queries ResponsesStore issues: ordered by created_at, optionally filtered
+# by model. They are not covering: the list queries select whole rows, so the 51 rows of a page
+# are still read from the table, but nothing else is read or sorted. Covering SELECT * would
+# copy the response JSON into the index. Retrieval by id and the pagination cursor lookup already
+# use the primary key.
+RESPONSE_INDEXES = {
+    "idx_openai_responses_created_at": "openai_responses (created_at, id)",
+    "idx_openai_responses_model_created_at": "openai_responses (model, created_at)",
+}
+
+# The statements ResponsesStore runs, used for query plans and the benchmark
+QUERIES = {
+    "retrieve": "SELECT * FROM openai_responses WHERE id = :id",
+    "list": "SELECT * FROM openai_responses ORDER BY created_at DESC LIMIT 51",
+    "list_by_model": "SELECT * FROM openai_responses WHERE model = :model ORDER BY created_at DESC LIMIT 51",
+    "list_page_cursor": "SELECT created_at FROM openai_responses WHERE id = :id",
+    "list_page": "SELECT * FROM openai_responses WHERE created_at < :created_at ORDER BY created_at DESC LIMIT 51",
+}
+
+
+def connect(path):
+    if not os.path.exists(path):
+        raise SystemExit(f"{path} does not exist")
+    # Wait for the server's write transactions instead of failing with "database is locked"
+    return sqlite3.connect(path, timeout=30, isolation_level=None)
+
+
+def tables(db):
+    return [row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+
+
+def analyze(args):
+    for path in (args.responses_db, args.agents_db):
+        if not os.path.exists(path):
+            print(f"{path}: not found")
+            continue
+        db = connect(path)
+        page_size = db.execute("PRAGMA page_size").fetchone()[0]
+        pages = db.execute("PRAGMA page_count").fetchone()[0]
+        free = db.execute("PRAGMA freelist_count").fetchone()[0]
+        mode = db.execute("PRAGMA journal_mode").fetchone()[0]
+        wal = path + "-wal"
+        wal_size = os.path.getsize(wal) if os.path.exists(wal) else 0
+        print(f"\n{path}: {pages * page_size / 1e6:.1f} MB ({free * page_size / 1e6:.1f} MB free pages), "
+              f"journal_mode={mode}, WAL file {wal_size / 1e6:.1f} MB")
+
+        for table in tables(db):
+            count = db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            columns = [row[1] for row in db.execute(f"PRAGMA table_info({table})")]
+            payload = "response_object" if "response_object" in columns else "value" if "value" in columns else None
+            size = db.execute(f"SELECT SUM(LENGTH({payload})) FROM {table}").fetchone()[0] if payload else None
+            indexes = [row[1] for row in db.execute(f"PRAGMA index_list({table})")]
+            line = f"  {table}: {count} rows"
+            if size:
+                line += f", {size / 1e6:.1f} MB of {payload}, {size / max(count, 1) / 1000:.1f} KB/row"
+            print(line + f", indexes: {', '.join(indexes) or 'none'}")
+
+        if "openai_responses" in tables(db):
+            print("  Query plans:")
+            sample = db.execute("SELECT id, model, created_at FROM openai_responses LIMIT 1").fetchone()
+            params = dict(zip(("id", "model", "created_at"), sample or ("", "", 0)))
+            for name, sql in QUERIES.items():
+                plan = "; ".join(row[3] for row in db.execute("EXPLAIN QUERY PLAN " + sql, params))
+                print(f"    {name:<18} {plan}")
+
+        if "kvstore" in tables(db):
+            print("  Keys by prefix:")
+            for prefix, count in db.execute(
+                "SELECT substr(key, 1, instr(key, ':') - 1), COUNT(*) FROM kvstore GROUP BY 1 ORDER BY 2 DESC"
+            ):
+                print(f"    {prefix or '(none)'}: {count}")
+        db.close()
+
+
+def add_indexes(args):
+    db = connect(args.responses_db)
+    for name, columns in RESPONSE_INDEXES.items():
+        started = time.perf_counter()
+        db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+        print(f"{name}: {time.perf_counter() - started:.2f}s")
+    # Refresh the statistics the query planner uses to pick the new indexes
+    db.execute("ANALYZE openai_responses")
+    db.close()
+
+
+def delete_in_batches(db, select_sql, params, delete_ids, batch_size, pause):
+    """
+    Delete the rows chosen by select_sql batch_size at a time, each batch in its own short
+    transaction, sleeping between batches so the server can take the write lock.
+    """
+    deleted = 0
+    while True:
+        ids = [row[0] for row in db.execute(select_sql + " LIMIT ?", (*params, batch_size))]
+        if not ids:
+            if deleted:
+                print()
+            return deleted
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            delete_ids(db, ids)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        deleted += len(ids)
+        print(f"  deleted {deleted}", end="\r")
+        time.sleep(pause)
+
+
+def prune(args):
+    if args.older_than_days is None and args.keep is None:
+        raise SystemExit("Pass --older-than-days and/or --keep")
+
+    if args.store == "responses":
+        db = connect(args.responses_db)
+
+        def delete_ids(db, ids):
+            db.executemany("DELETE FROM openai_responses WHERE id = ?", [(i,) for i in ids])
+
+        deleted = 0
+        if args.older_than_days is not None:
+            cutoff = int(time.time() - args.older_than_days * 86400)
+            deleted += delete_in_batches(
+                db, "SELECT id FROM openai_responses WHERE created_at < ? ORDER BY created_at", (cutoff,),
+                delete_ids, args.batch_size, args.pause,
+            )
+        if args.keep is not None:
+            # Everything older than the newest `keep` responses
+            deleted += delete_in_batches(
+                db, "SELECT id FROM (SELECT id FROM openai_responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (args.keep,),
+                delete_ids, args.batch_size, args.pause,
+            )
+        print(f"Deleted {deleted} responses")
+
+    else:
+        db = connect(args.agents_db)
+
+        def delete_ids(db, keys):
+            for key in keys:
+                _, agent_id, session_id = key.split(":", 2)
+                db.execute("DELETE FROM kvstore WHERE key = ?", (key,))
+                # Turns and per-turn bookkeeping of the session
+                for prefix in ("session", "num_infer_iters_in_turn", "in_progress_tool_call_step"):
+                    start = f"{prefix}:{agent_id}:{session_id}:"
+                    db.execute("DELETE FROM kvstore WHERE key >= ? AND key < ?", (start, start + "\xff\xff\xff\xff"))
+
+        # Session records are "session:<agent_id>:<session_id>"; their turns add a fourth part
+        sessions = ("SELECT key FROM kvstore WHERE key >= 'session:' AND key < 'session;' "
+                    "AND key NOT GLOB 'session:*:*:*'")
+        deleted = 0
+        if args.older_than_days is not None:
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=args.older_than_days)).isoformat()
+            deleted += delete_in_batches(
+                db, sessions + " AND json_extract(value, '$.started_at') < ?", (cutoff,),
+                delete_ids, args.batch_size, args.pause,
+            )
+        if args.keep is not None:
+            deleted += delete_in_batches(
+                db, f"SELECT key FROM ({sessions} ORDER BY json_extract(value, '$.started_at') DESC LIMIT -1 OFFSET ?)",
+                (args.keep,),
+                delete_ids, args.batch_size, args.pause,
+            )
+        print(f"Deleted {deleted} sessions")
+
+        # Expired kvstore entries are never read again
+        def delete_rowids(db, rowids):
+            db.executemany("DELETE FROM kvstore WHERE rowid = ?", [(r,) for r in rowids])
+
+        expired = delete_in_batches(
+            db, "SELECT rowid FROM kvstore WHERE expiration IS NOT NULL AND expiration < ?",
+            (datetime.now().isoformat(" "),),
+            delete_rowids, args.batch_size, args.pause,
+        )
+        print(f"Deleted {expired} expired kvstore entries")
+    db.close()
+
+
+def wal(args):
+    for path in (args.responses_db, args.agents_db):
+        if not os.path.exists(path):
+            continue
+        db = connect(path)
+        mode = db.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        # Readers no longer block the writer in WAL mode, so NORMAL sync is safe enough here
+        db.execute("PRAGMA synchronous=NORMAL")
+        busy, log, checkpointed = db.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        print(f"{path}: journal_mode={mode}, checkpointed {checkpointed}/{log} pages"
+              + (" (busy, retry later)" if busy else ""))
+        db.close()
+
+
+def bench(args):
+    db = connect(args.responses_db)
+    rows = db.execute("SELECT id, model, created_at FROM openai_responses").fetchall()
+    if not rows:
+        raise SystemExit("openai_responses is empty; use the seed subcommand to create test data")
+    rng = random.Random(0)
+
+    results = {}
+    for name, sql in QUERIES.items():
+        timings = []
+        for _ in range(args.iterations):
+            response_id, model, created_at = rng.choice(rows)
+            started = time.perf_counter()
+            db.execute(sql, {"id": response_id, "model": model, "created_at": created_at}).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[name] = {
+            "p50_ms": statistics.median(timings),
+            "p95_ms": timings[int(len(timings) * 0.95) - 1],
+            "max_ms": timings[-1],
+        }
+        print(f"{name:<18} p50={results[name]['p50_ms']:8.3f}ms p95={results[name]['p95_ms']:8.3f}ms "
+              f"max={results[name]['max_ms']:8.3f}ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            before = json.load(f)
+        print("\nCompared with", args.compare)
+        for name, result in results.items():
+            if name in before:
+                print(f"{name:<18} p50 {before[name]['p50_ms']:8.3f}ms -> {result['p50_ms']:8.3f}ms "
+                      f"({before[name]['p50_ms'] / max(result['p50_ms'], 1e-6):.1f}x)")
+    db.close()
+
+
+def seed(args):
+    os.makedirs(os.path.dirname(os.path.abspath(args.responses_db)), exist_ok=True)
+    db = sqlite3.connect(args.responses_db)
+    # Same schema the server creates through SQLAlchemy
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS openai_responses (id VARCHAR NOT NULL, created_at INTEGER, "
+        "response_object JSON, model VARCHAR, access_attributes JSON, owner_principal VARCHAR, PRIMARY KEY (id))"
+    )
+    models = ["ollama/llama3.2:3b", "ollama/gpt-oss:latest", "openai/gpt-4o"]
+    now = int(time.time())
+    text = "The quick brown fox jumps over the lazy dog. " * 20
+    batch = []
+    for i in range(args.responses):
+        response_id = f"resp-{uuid.uuid4()}"
+        created_at = now - args.days * 86400 + i * args.days * 86400 // args.responses
+        model = models[i % len(models)]
+        response = {
+            "id": response_id, "created_at": created_at, "model": model, "object": "response", "status": "completed",
+            "output": [{"type": "message", "role": "assistant", "content": [{"type": "output_text", "text": text}]}],
+            "input": [{"type": "message", "role": "user", "content": "Tell me a story"}],
+        }
+        batch.append((response_id, created_at, json.dumps(response), model))
+        if len(batch) == 10_000:
+            db.executemany("INSERT INTO openai_responses (id, created_at, response_object, model) "
+                           "VALUES (?, ?, ?, ?)", batch)
+            batch.clear()
+    db.executemany("INSERT INTO openai_responses (id, created_at, response_object, model) VALUES (?, ?, ?, ?)", batch)
+    db.commit()
+    db.close()
+    print(f"Inserted {args.responses} responses spread over {args.days} days into {args.responses_db}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Maintain the Llama Stack SQLite stores")
+    parser.add_argument("--responses-db", default=RESPONSES_DB)
+    parser.add_argument("--agents-db", default=AGENTS_DB)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("analyze", help="Table sizes and query plans").set_defaults(func=analyze)
+    commands.add_parser("index", help="Add indexes for the Responses API lookups").set_defaults(func=add_indexes)
+    commands.add_parser("wal", help="Enable WAL and checkpoint").set_defaults(func=wal)
+
+    prune_parser = commands.add_parser("prune", help="Delete old responses or sessions in batches")
+    prune_parser.add_argument("store", choices=["responses", "sessions"])
+    prune_parser.add_argument("--older-than-days", type=float)
+    prune_parser.add_argument("--keep", type=int, help="Keep only the newest N")
+    prune_parser.add_argument("--batch-size", type=int, default=500)
+    prune_parser.add_argument("--pause", type=float, default=0.05, help="Seconds between batches")
+    prune_parser.set_defaults(func=prune)
+
+    bench_parser = commands.add_parser("bench", help="Time retrieve and list queries")
+    bench_parser.add_argument("--iterations", type=int, default=200)
+    bench_parser.add_argument("--output", help="Save the timings as JSON")
+    bench_parser.add_argument("--compare", help="Timings saved by a previous run")
+    bench_parser.set_defaults(func=bench)
+
+    seed_parser = commands.add_parser("seed", help="Insert synthetic responses")
+    seed_parser.add_argument("--responses", type=int, default=100_000)
+    seed_parser.add_argument("--days", type=int, default=90)
+    seed_parser.set_defaults(func=seed)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    args.func(args)
@@ -0,0 +1,143 @@
+"""
+Benchmark the client-side code path of each example against the local mock server.
+
+The mock server is started in-process on the ports the examples hard-code (Llama Stack
+on 8321, vLLM on 8000 and Ollama on 11434), and OpenAI() clients are pointed at it through
+OPENAI_BASE_URL, so no network access, API key or GPU is needed. Each workload is run a
+number of times with its printed output captured, and the timings can be saved and compared
+against a previous run to catch client-side overhead regressions.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import runpy
+import statistics
+import sys
+import time
+
+from server import MockConfig, serve
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Makes the travel planning prompt in max_tool_calls.py produce several function calls
+TOOL_SCRIPT = {
+    "rules": [
+        {"match": "travel", "calls": [
+            {"name": "get_weather", "arguments": {"location": "New York"}},
+            {"name": "get_weather", "arguments": {"location": "Paris"}},
+            {"name": "get_time", "arguments": {"location": "Paris"}},
+            {"name": "calculate_distance", "arguments": {"from_location": "New York", "to_location": "Paris"}},
+        ]},
+        {"match": "weather", "calls": [
+            {"name": "get_weather", "arguments": {"location": "Paris"}},
+        ]},
+    ]
+}
+
+
+def run_script(path):
+    return lambda: runpy.run_path(os.path.join(ROOT, path), run_name="__main__")
+
+
+def workloads(include_crewai):
+    sys.path.insert(0, os.path.join(ROOT, "responses", "src"))
+    sys.path.insert(0, os.path.join(ROOT, "safety", "src"))
+    import include
+    import max_tool_calls
+    import reasoning_chat_completions
+    import reasoning_responses
+
+    selected = {
+        "responses/include.basic_logprobs": include.test_basic_logprobs,
+        "responses/include.function_tools": include.test_logprobs_with_function_tool_calls,
+        "responses/include.mcp_tools": include.test_logprobs_with_mcp_tools,
+        "responses/max_tool_calls.function_tools": max_tool_calls.test_function_tools,
+        "responses/max_tool_calls.builtin_tools": max_tool_calls.test_builtin_tools,
+        "responses/reasoning_responses.lls_stream": reasoning_responses.test_reasoning_with_lls,
+        "responses/reasoning_responses.vllm": reasoning_responses.test_reasoning_with_vllm,
+        "responses/reasoning_chat_completions.ollama": reasoning_chat_completions.test_reasoning_with_ollama,
+        "safety/safety_api": run_script("safety/src/safety_api.py"),
+        "safety/moderations": run_script("safety/src/moderations.py"),
+    }
+    if include_crewai:
+        selected["crewai/client"] = run_script("crewai/src/client.py")
+    return selected
+
+
+def time_workload(func, iterations, warmup):
+    timings = []
+    for i in range(warmup + iterations):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+    return timings
+
+
+def summarize(timings):
+    cut_points = statistics.quantiles(timings, n=100, method="inclusive") if len(timings) > 1 else timings * 99
+    return {
+        "iterations": len(timings),
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": cut_points[49],
+        "p95_ms": cut_points[94],
+        "min_ms": min(timings),
+    }
+
+
+def print_table(results, baseline):
+    print(f"{'workload':<46} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'min ms':>9} {'vs base':>9}")
+    for name, stats in results.items():
+        change = ""
+        if name in baseline:
+            change = f"{(stats['mean_ms'] / baseline[name]['mean_ms'] - 1) * 100:+.1f}%"
+        print(f"{name:<46} {stats['mean_ms']:>9.2f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p95_ms']:>9.2f} {stats['min_ms']:>9.2f} {change:>9}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the examples against the mock server")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock server latency in seconds")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Mock server tokens per second")
+    parser.add_argument("--filter", default="", help="Only run workloads containing this substring")
+    parser.add_argument("--crewai", action="store_true", help="Also run the CrewAI client")
+    parser.add_argument("--output", help="Save results as JSON")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    config = MockConfig(latency=args.latency, token_rate=args.token_rate, script=TOOL_SCRIPT)
+    serve(config, [8321, 8000, 11434])
+
+    os.environ["OPENAI_BASE_URL"] = "http://127.0.0.1:8321/v1/openai/v1"
+    os.environ["OPENAI_API_KEY"] = "mock"
+    os.environ.setdefault("GITHUB_TOKEN", "mock")
+    # The Llama Stack client logs every request, which would dominate the timings
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    for name, func in workloads(args.crewai).items():
+        if args.filter in name:
+            results[name] = summarize(time_workload(func, args.iterations, args.warmup))
+
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
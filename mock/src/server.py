@@ -0,0 +1,498 @@
+"""
+Local stand-in for the Llama Stack and OpenAI-compatible endpoints used by the examples.
+
+The server answers chat completions, Responses (including SSE streaming), moderations
+and run-shield requests with canned output, so the client-side code paths can be
+exercised and benchmarked without Ollama, vLLM, a Llama Stack instance or api.openai.com.
+
+Latency, token rate, prompt processing rate, the reply text and the function calls returned for a prompt are
+configurable. A tool-call script is a JSON file of rules; the first rule whose "match"
+substring appears in the last user message decides which function calls the model makes:
+
+    {"rules": [{"match": "weather", "calls": [{"name": "get_weather", "arguments": {"location": "Paris"}}]}]}
+"""
+
+import argparse
+import json
+import math
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_REPLY = "The quick brown fox jumps over the lazy dog near the quiet river bank."
+DEFAULT_REASONING = "The user asks a simple question. Count carefully and answer briefly."
+DEFAULT_UNSAFE_PATTERNS = ["bomb", "weapon", "kill"]
+REFUSAL = "I can't answer that. Can I help with something else?"
+
+MODERATION_CATEGORIES = [
+    "harassment", "harassment/threatening", "hate", "hate/threatening", "illicit",
+    "illicit/violent", "self-harm", "self-harm/instructions", "self-harm/intent",
+    "sexual", "sexual/minors", "violence", "violence/graphic",
+]
+
+
+class MockConfig:
+    """
+    Behaviour shared by every port the mock server listens on.
+    """
+
+    def __init__(self, latency=0.0, token_rate=0.0, reply=DEFAULT_REPLY,
+                 reasoning=DEFAULT_REASONING, unsafe_patterns=None, script=None, prefill_rate=0.0):
+        self.latency = latency              # seconds before the first byte
+        self.token_rate = token_rate        # output tokens per second, 0 means unpaced
+        self.prefill_rate = prefill_rate    # prompt tokens per second, 0 means free prompt processing
+        self.reply = reply
+        self.reasoning = reasoning
+        self.unsafe_patterns = [p.lower() for p in (unsafe_patterns or DEFAULT_UNSAFE_PATTERNS)]
+        self.rules = (script or {}).get("rules", [])
+        self.responses = {}                 # stored Responses objects for previous_response_id
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_args(cls, args):
+        script = None
+        if args.script:
+            with open(args.script, encoding="utf-8") as f:
+                script = json.load(f)
+        return cls(
+            latency=args.latency,
+            token_rate=args.token_rate,
+            prefill_rate=args.prefill_rate,
+            reply=args.reply,
+            unsafe_patterns=args.unsafe_pattern,
+            script=script,
+        )
+
+    def tokens(self, text):
+        return re.findall(r"\S+\s*", text)
+
+    def pace(self, n_tokens):
+        if self.token_rate > 0:
+            time.sleep(n_tokens / self.token_rate)
+
+    def prefill(self, n_tokens):
+        if self.prefill_rate > 0:
+            time.sleep(n_tokens / self.prefill_rate)
+
+    def is_unsafe(self, text):
+        text = text.lower()
+        return any(p in text for p in self.unsafe_patterns)
+
+    def tool_calls_for(self, text, tool_names):
+        for rule in self.rules:
+            if rule.get("match", "").lower() in text.lower():
+                return [c for c in rule.get("calls", []) if c["name"] in tool_names]
+        return []
+
+
+def new_id(prefix):
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+def count_tokens(text):
+    return max(1, math.ceil(len(text) / 4))
+
+
+def content_text(content):
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text", "") for part in content if isinstance(part, dict)
+        )
+    return ""
+
+
+def fake_logprobs(token, top_n):
+    # Deterministic pseudo logprobs so repeated runs produce identical payloads
+    logprob = -((sum(map(ord, token)) % 97) / 40.0)
+    return {
+        "token": token,
+        "bytes": list(token.encode("utf-8")),
+        "logprob": logprob,
+        "top_logprobs": [
+            {"token": token, "bytes": list(token.encode("utf-8")), "logprob": logprob - i}
+            for i in range(top_n)
+        ],
+    }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle enabled keep-alive requests stall ~40ms
+    disable_nagle_algorithm = True
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ---- plumbing -------------------------------------------------------
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def send_json(self, body, status=200):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def start_sse(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+    def send_event(self, data, event=None):
+        chunk = f"data: {json.dumps(data)}\n\n"
+        if event:
+            chunk = f"event: {event}\n" + chunk
+        self.wfile.write(chunk.encode("utf-8"))
+        self.wfile.flush()
+
+    def not_found(self):
+        self.send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path.endswith("/shields"):
+            self.send_json({"data": [{
+                "identifier": "llama-guard3:1b",
+                "provider_id": "llama-guard",
+                "provider_resource_id": "llama-guard3:1b",
+                "type": "shield",
+            }]})
+        elif "/responses/" in path:
+            response_id = path.rsplit("/", 1)[-1]
+            with self.config.lock:
+                response = self.config.responses.get(response_id)
+            if response is None:
+                self.not_found()
+            else:
+                self.send_json(response)
+        elif path.endswith("/models"):
+            self.send_json({"object": "list", "data": []})
+        else:
+            self.not_found()
+
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        body = self.read_json()
+        time.sleep(self.config.latency)
+
+        if path.endswith("/chat/completions"):
+            self.handle_chat_completions(body)
+        elif path.endswith("/responses"):
+            self.handle_responses(body)
+        elif path.endswith("/moderations"):
+            self.handle_moderations(body)
+        elif path.endswith("/safety/run-shield"):
+            self.handle_run_shield(body)
+        else:
+            self.not_found()
+
+    # ---- safety ---------------------------------------------------------
+
+    def handle_moderations(self, body):
+        inputs = body.get("input", "")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+
+        results = []
+        for text in inputs:
+            flagged = self.config.is_unsafe(content_text(text))
+            results.append({
+                "flagged": flagged,
+                "categories": {c: flagged and c == "illicit/violent" for c in MODERATION_CATEGORIES},
+                "category_scores": {
+                    c: 0.99 if flagged and c == "illicit/violent" else 0.0 for c in MODERATION_CATEGORIES
+                },
+                "category_applied_input_types": {c: ["text"] for c in MODERATION_CATEGORIES},
+                "user_message": REFUSAL if flagged else None,
+                "metadata": {"violation_type": "S1"} if flagged else {},
+            })
+
+        self.send_json({"id": new_id("modr"), "model": body.get("model"), "results": results})
+
+    def handle_run_shield(self, body):
+        text = " ".join(content_text(m.get("content")) for m in body.get("messages", []))
+        self.config.prefill(count_tokens(text))
+        violation = None
+        if self.config.is_unsafe(text):
+            violation = {
+                "violation_level": "error",
+                "user_message": REFUSAL,
+                "metadata": {"violation_type": "S1"},
+            }
+        self.send_json({"violation": violation})
+
+    # ---- chat completions ----------------------------------------------
+
+    def handle_chat_completions(self, body):
+        config = self.config
+        messages = body.get("messages", [])
+        prompt = content_text(messages[-1].get("content")) if messages else ""
+        tool_names = {
+            t["function"]["name"] for t in body.get("tools", []) if t.get("type") == "function"
+        }
+        answered = any(m.get("role") == "tool" for m in messages)
+        calls = [] if answered else config.tool_calls_for(prompt, tool_names)
+        reasoning = config.reasoning if body.get("reasoning_effort") else None
+
+        tokens = config.tokens(config.reply)
+        prompt_tokens = sum(count_tokens(content_text(m.get("content"))) for m in messages)
+        config.prefill(prompt_tokens)
+        reasoning_tokens = len(config.tokens(reasoning)) if reasoning else 0
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens) + reasoning_tokens,
+            "total_tokens": prompt_tokens + len(tokens) + reasoning_tokens,
+            "completion_tokens_details": {"reasoning_tokens": reasoning_tokens},
+        }
+        tool_calls = [
+            {
+                "id": new_id("call"),
+                "type": "function",
+                "function": {"name": c["name"], "arguments": json.dumps(c.get("arguments", {}))},
+            }
+            for c in calls
+        ]
+        completion_id = new_id("chatcmpl")
+        base = {"id": completion_id, "created": int(time.time()), "model": body.get("model")}
+
+        if not body.get("stream"):
+            config.pace(usage["completion_tokens"])
+            message = {"role": "assistant", "content": None if calls else config.reply}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            if reasoning:
+                message["reasoning"] = reasoning
+            self.send_json({
+                **base,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if calls else "stop",
+                }],
+                "usage": usage,
+            })
+            return
+
+        self.start_sse()
+
+        def chunk(delta, finish_reason=None, **extra):
+            self.send_event({
+                **base,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            })
+
+        chunk({"role": "assistant", "content": ""})
+        if reasoning:
+            for token in config.tokens(reasoning):
+                config.pace(1)
+                chunk({"reasoning": token})
+        if calls:
+            for i, call in enumerate(tool_calls):
+                chunk({"tool_calls": [{"index": i, **call}]})
+        else:
+            for token in tokens:
+                config.pace(1)
+                chunk({"content": token})
+        chunk({}, finish_reason="tool_calls" if calls else "stop", usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    # ---- responses ------------------------------------------------------
+
+    def handle_responses(self, body):
+        config = self.config
+        previous_id = body.get("previous_response_id")
+        if previous_id:
+            with config.lock:
+                if previous_id not in config.responses:
+                    self.send_json(
+                        {"error": {"message": f"Response {previous_id} not found"}}, status=404
+                    )
+                    return
+
+        input_items = body.get("input", "")
+        if isinstance(input_items, str):
+            input_items = [{"role": "user", "content": input_items}]
+        user_items = [i for i in input_items if i.get("role") == "user"]
+        prompt = content_text(user_items[-1].get("content")) if user_items else ""
+
+        tool_names = {t.get("name") for t in body.get("tools", []) if t.get("type") == "function"}
+        answered = any(i.get("type") == "function_call_output" for i in input_items)
+        calls = [] if answered else config.tool_calls_for(prompt, tool_names)
+        if body.get("max_tool_calls") is not None:
+            calls = calls[:body["max_tool_calls"]]
+
+        include = body.get("include") or []
+        top_n = body.get("top_logprobs") or 0
+        with_logprobs = "message.output_text.logprobs" in include
+        reasoning = config.reasoning if (body.get("reasoning") or {}).get("effort") else None
+        tokens = [] if calls else config.tokens(config.reply)
+        reasoning_tokens = config.tokens(reasoning) if reasoning else []
+        input_tokens = sum(count_tokens(content_text(i.get("content"))) for i in input_items)
+        config.prefill(input_tokens)
+
+        response_id = new_id("resp")
+        output = []
+        if reasoning:
+            output.append({
+                "type": "reasoning",
+                "id": new_id("rs"),
+                "summary": [],
+                "content": [{"type": "reasoning_text", "text": reasoning}],
+            })
+        for call in calls:
+            output.append({
+                "type": "function_call",
+                "id": new_id("fc"),
+                "call_id": new_id("call"),
+                "name": call["name"],
+                "arguments": json.dumps(call.get("arguments", {})),
+                "status": "completed",
+            })
+        if tokens:
+            output.append({
+                "type": "message",
+                "id": new_id("msg"),
+                "role": "assistant",
+                "status": "completed",
+                "content": [{
+                    "type": "output_text",
+                    "text": config.reply,
+                    "annotations": [],
+                    "logprobs": [fake_logprobs(t, top_n) for t in tokens] if with_logprobs else [],
+                }],
+            })
+
+        response = {
+            "id": response_id,
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": body.get("model"),
+            "status": "completed",
+            "output": output,
+            "previous_response_id": previous_id,
+            "parallel_tool_calls": True,
+            "tool_choice": body.get("tool_choice", "auto"),
+            "tools": body.get("tools", []),
+            "max_tool_calls": body.get("max_tool_calls"),
+            "usage": {
+                "input_tokens": input_tokens,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": len(tokens) + len(reasoning_tokens),
+                "output_tokens_details": {"reasoning_tokens": len(reasoning_tokens)},
+                "total_tokens": input_tokens + len(tokens) + len(reasoning_tokens),
+            },
+        }
+        if body.get("store", True):
+            with config.lock:
+                config.responses[response_id] = response
+
+        if not body.get("stream"):
+            config.pace(len(tokens) + len(reasoning_tokens))
+            self.send_json(response)
+            return
+
+        self.start_sse()
+        sequence = iter(range(1 << 30))
+
+        def event(type_, **fields):
+            self.send_event({"type": type_, "sequence_number": next(sequence), **fields}, event=type_)
+
+        event("response.created", response={**response, "status": "in_progress", "output": []})
+        for index, item in enumerate(output):
+            if item["type"] == "message":
+                added = {**item, "status": "in_progress", "content": []}
+            else:
+                added = item
+            event("response.output_item.added", output_index=index, item=added)
+
+            if item["type"] == "reasoning":
+                for token in reasoning_tokens:
+                    config.pace(1)
+                    event("response.reasoning_text.delta", item_id=item["id"],
+                          output_index=index, content_index=0, delta=token)
+                event("response.reasoning_text.done", item_id=item["id"],
+                      output_index=index, content_index=0, text=reasoning)
+            elif item["type"] == "message":
+                part = item["content"][0]
+                event("response.content_part.added", item_id=item["id"], output_index=index,
+                      content_index=0, part={"type": "output_text", "text": "", "annotations": []})
+                for token, logprob in zip(tokens, part["logprobs"] or [None] * len(tokens)):
+                    config.pace(1)
+                    event("response.output_text.delta", item_id=item["id"], output_index=index,
+                          content_index=0, delta=token, logprobs=[logprob] if logprob else [])
+                event("response.output_text.done", item_id=item["id"], output_index=index,
+                      content_index=0, text=part["text"], logprobs=part["logprobs"])
+                event("response.content_part.done", item_id=item["id"], output_index=index,
+                      content_index=0, part=part)
+            event("response.output_item.done", output_index=index, item=item)
+        event("response.completed", response=response)
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default listen backlog of 5 resets connections under concurrent benchmarks
+    request_queue_size = 128
+
+
+def serve(config, ports, host="127.0.0.1", verbose=False):
+    """
+    Start one server per port in daemon threads and return the servers.
+    """
+    servers = []
+    for port in ports:
+        server = MockServer((host, port), MockHandler)
+        server.config = config
+        server.verbose = verbose
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mock Llama Stack / OpenAI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, action="append",
+                        help="Port to listen on; repeat to listen on several (default 8321)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first byte")
+    parser.add_argument("--token-rate", type=float, default=0.0,
+                        help="Output tokens per second (0 disables pacing)")
+    parser.add_argument("--prefill-rate", type=float, default=0.0,
+                        help="Prompt tokens processed per second (0 makes prompt length free)")
+    parser.add_argument("--reply", default=DEFAULT_REPLY, help="Assistant reply text")
+    parser.add_argument("--unsafe-pattern", action="append",
+                        help="Substring that makes shields and moderations flag the input")
+    parser.add_argument("--script", help="JSON file with tool-call rules")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    ports = args.port or [8321]
+    serve(MockConfig.from_args(args), ports, host=args.host, verbose=args.verbose)
+    print(f"Mock server listening on {args.host}:{', '.join(map(str, ports))}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
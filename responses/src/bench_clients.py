@@ -0,0 +1,53 @@
+"""
+Compare a fresh OpenAI() client per call with the shared clients from openai_clients.py.
+
+Each iteration makes one cheap request (GET /models). With a fresh client every request pays
+for client construction and a new connection (plus a TLS handshake for https endpoints); the
+shared client reuses a kept-alive connection from its pool.
+"""
+
+import argparse
+import statistics
+import time
+
+from openai import OpenAI
+
+from openai_clients import get_openai_client
+
+
+def fresh_client_call(base_url, api_key):
+    client = OpenAI(base_url=base_url, api_key=api_key)
+    try:
+        client.models.list()
+    finally:
+        client.close()
+
+
+def shared_client_call(base_url, api_key):
+    get_openai_client(base_url=base_url, api_key=api_key).models.list()
+
+
+def measure(label, func, iterations, base_url, api_key):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func(base_url, api_key)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<24} mean={statistics.fmean(timings):8.2f}ms "
+          f"p50={statistics.median(timings):8.2f}ms max={max(timings):8.2f}ms")
+    return statistics.fmean(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark client construction and connection reuse")
+    parser.add_argument("--base-url", default="http://localhost:8321/v1/openai/v1")
+    parser.add_argument("--api-key", default="random")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    # Warm up the shared pool so the comparison measures steady state
+    shared_client_call(args.base_url, args.api_key)
+
+    fresh = measure("fresh OpenAI() per call", fresh_client_call, args.iterations, args.base_url, args.api_key)
+    shared = measure("shared pooled client", shared_client_call, args.iterations, args.base_url, args.api_key)
+    print(f"Connection and client setup overhead saved per call: {fresh - shared:.2f}ms")
@@ -0,0 +1,39 @@
+"""
+Benchmark per-call calculate_distance against the batched distance engine.
+"""
+
+import argparse
+import random
+import time
+
+from custom_tools import calculate_distance
+from distance import CITY_COORDINATES, ENGINE, HOT_CITIES, batch_calculate_distance
+
+
+def random_pairs(n, cities, seed=0):
+    rng = random.Random(seed)
+    return [(rng.choice(cities), rng.choice(cities)) for _ in range(n)]
+
+
+def measure(label, n, func):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {n / elapsed:>14,.0f} pairs/s {elapsed * 1e6 / n:>10.2f} us/pair")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark calculate_distance throughput")
+    parser.add_argument("--pairs", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for label, cities in (("hot set", HOT_CITIES), ("all cities", list(CITY_COORDINATES))):
+        pairs = random_pairs(args.pairs, cities)
+        print(f"{args.pairs} random pairs from the {label}:")
+        measure("  per-call calculate_distance", len(pairs),
+                lambda: [calculate_distance(a, b) for a, b in pairs])
+        measure("  batch_calculate_distance", len(pairs),
+                lambda: batch_calculate_distance(pairs))
+        from_locations, to_locations = zip(*pairs)
+        measure("  ENGINE.distances_miles (array)", len(pairs),
+                lambda: ENGINE.distances_miles(from_locations, to_locations))
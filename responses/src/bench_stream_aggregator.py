@@ -0,0 +1,82 @@
+"""
+Benchmark consuming a Responses event stream with StreamAggregator against per-event pydantic
+models (with and without the model_dump_json(indent=2) the examples print).
+
+One streamed response is fetched from --base-url, then replayed from memory through an
+httpx.MockTransport, so the numbers measure client-side parsing only.
+"""
+
+import argparse
+import time
+
+import httpx
+from openai import OpenAI
+
+from stream_aggregator import StreamAggregator, sse_events
+
+
+def fetch_stream(base_url, model, prompt):
+    body = {
+        "model": model,
+        "input": prompt,
+        "stream": True,
+        "include": ["message.output_text.logprobs"],
+    }
+    with httpx.Client(timeout=120) as http:
+        response = http.post(base_url.rstrip("/") + "/responses", json=body)
+        response.raise_for_status()
+        return response.content
+
+
+def replay_client(payload):
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=payload)
+
+    return OpenAI(base_url="http://replay/v1", api_key="replay",
+                  http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+
+def pydantic_dump(client, model):
+    events = 0
+    for event in client.responses.create(model=model, input="replay", stream=True):
+        event.model_dump_json(indent=2)
+        events += 1
+    return events
+
+
+def pydantic_only(client, model):
+    events = 0
+    for event in client.responses.create(model=model, input="replay", stream=True):
+        events += 1
+    return events
+
+
+def aggregated(client, model):
+    aggregator = StreamAggregator()
+    for _ in aggregator.consume(sse_events(client, model=model, input="replay")):
+        pass
+    return aggregator.events
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Responses stream consumers")
+    parser.add_argument("--base-url", default="http://localhost:8321/v1/openai/v1")
+    parser.add_argument("--model", default="ollama/llama3.2:3b")
+    parser.add_argument("--prompt", default="Write a long story about a lighthouse keeper.")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    payload = fetch_stream(args.base_url, args.model, args.prompt)
+    client = replay_client(payload)
+
+    for label, consume in (
+        ("pydantic + model_dump_json", pydantic_dump),
+        ("pydantic events only", pydantic_only),
+        ("StreamAggregator (raw SSE)", aggregated),
+    ):
+        events = 0
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            events += consume(client, args.model)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<30} {events / elapsed:>12,.0f} events/s {elapsed * 1e6 / events:>8.1f} us/event")
@@ -0,0 +1,52 @@
+"""
+Benchmark the cost of validating function_call.arguments with the compiled tool validators.
+"""
+
+import argparse
+import json
+import time
+
+from tool_registry import REGISTRY, ToolArgumentError
+
+CASES = [
+    ("get_weather", '{"location": "Tokyo"}'),
+    ("get_weather", '{"location": "London", "unit": "celsius"}'),
+    ("get_time", '{"location": "Paris"}'),
+    ("calculate_distance", '{"from_location": "New York", "to_location": "Tokyo"}'),
+]
+
+INVALID = [
+    ("get_weather", '{"location": "Tokyo", "unit": "kelvin"}'),
+    ("calculate_distance", '{"from_location": "New York"}'),
+    ("get_time", '{"location": 42}'),
+]
+
+
+def measure(label, n, func):
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {elapsed * 1e9 / n:>10.0f} ns/call")
+
+
+def rejecting(cases):
+    for name, arguments in cases:
+        try:
+            REGISTRY.validate(name, arguments)
+        except ToolArgumentError:
+            pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark tool argument validation")
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    valid = CASES * (args.calls // len(CASES))
+    invalid = INVALID * (args.calls // len(INVALID))
+
+    print(f"{len(valid)} function_call arguments:")
+    measure("  json.loads only", len(valid), lambda: [json.loads(a) for _, a in valid])
+    measure("  REGISTRY.validate (valid)", len(valid), lambda: [REGISTRY.validate(n, a) for n, a in valid])
+    measure("  REGISTRY.validate (invalid)", len(invalid), lambda: rejecting(invalid))
+    measure("  REGISTRY.tools (cached)", len(valid), lambda: [REGISTRY.tools for _ in valid])
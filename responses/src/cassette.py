@@ -0,0 +1,375 @@
+"""
+Record/replay httpx transports for running the experiments offline.
+
+A cassette is one append-only file of records. Each record is a fixed header (the sha256 of the
+request and the length of the payload) followed by the zlib-compressed JSON of the response:
+status, headers and the raw body chunks, each with the time it arrived relative to the request.
+SSE streams are therefore recorded event by event with their original timing.
+
+Opening a cassette only reads the record headers to build an in-memory index from request hash to
+record offsets, so a lookup is a dict access and one seek. Only the last record is decompressed
+(zlib checks its adler32) so that a record left truncated by a crash during recording is dropped;
+the next append overwrites it. A request that was sent several times
+during recording is replayed in the same order, and the last recording is reused after that.
+
+Replay either returns the chunks as fast as possible or, with realtime=True, sleeps between chunks
+to reproduce the recorded pacing (useful for the latency metrics in stream_metrics.py).
+
+openai_clients.py enables this with environment variables:
+
+    OPENAI_CASSETTE=experiments.cassette OPENAI_CASSETTE_MODE=record uv run python src/include.py
+    OPENAI_CASSETTE=experiments.cassette OPENAI_CASSETTE_MODE=replay uv run python src/include.py
+
+OPENAI_CASSETTE_MODE is one of record, replay (as fast as possible) or realtime.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+import httpx
+
+HEADER = struct.Struct(">32sI")
+MODES = ("record", "replay", "realtime")
+
+# Headers that differ on every run and do not identify the request
+VOLATILE_HEADERS = {"date", "set-cookie", "x-request-id", "openai-processing-ms", "cf-ray"}
+
+
+class CassetteMiss(LookupError):
+    """The request was not recorded in the cassette."""
+
+
+def request_key(request):
+    """
+    Hash of the method, URL and body of a request. JSON bodies are canonicalized so that key
+    order does not matter.
+    """
+    body = request.content
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            pass
+    digest = hashlib.sha256()
+    digest.update(request.method.encode("ascii"))
+    digest.update(b" " + str(request.url).encode("utf-8") + b"\n")
+    digest.update(body)
+    return digest.digest()
+
+
+class Cassette:
+    """
+    Append-only, compressed store of recorded responses indexed by request hash.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = {}
+        self.replayed = {}
+        self.lock = threading.Lock()
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        self._reader = None
+        self._truncate_to = None
+        if os.path.exists(path):
+            self._load_index()
+
+    def _load_index(self):
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            offset = 0
+            last = None
+            while True:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                key, length = HEADER.unpack(header)
+                if offset + HEADER.size + length > size:
+                    break
+                self.index.setdefault(key, []).append(offset)
+                last = (key, offset, length)
+                offset += HEADER.size + length
+                f.seek(offset)
+
+            if last is not None:
+                key, last_offset, length = last
+                f.seek(last_offset + HEADER.size)
+                try:
+                    zlib.decompress(f.read(length))
+                except zlib.error:
+                    self.index[key].pop()
+                    offset = last_offset
+        if offset != size:
+            self._truncate_to = offset
+
+    def __len__(self):
+        return sum(len(offsets) for offsets in self.index.values())
+
+    def append(self, key, record):
+        payload = zlib.compress(json.dumps(record, separators=(",", ":")).encode("utf-8"), 6)
+        with self.lock:
+            if self._truncate_to is not None:
+                os.truncate(self.path, self._truncate_to)
+                self._truncate_to = None
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(HEADER.pack(key, len(payload)) + payload)
+            self.index.setdefault(key, []).append(offset)
+            self.stats["recorded"] += 1
+
+    def lookup(self, key):
+        """
+        Return the next recorded response for a request hash, or raise CassetteMiss.
+        """
+        with self.lock:
+            offsets = self.index.get(key)
+            if not offsets:
+                self.stats["misses"] += 1
+                raise CassetteMiss(key.hex())
+            occurrence = self.replayed.get(key, 0)
+            self.replayed[key] = occurrence + 1
+            offset = offsets[min(occurrence, len(offsets) - 1)]
+
+            if self._reader is None:
+                self._reader = open(self.path, "rb")
+            self._reader.seek(offset)
+            _, length = HEADER.unpack(self._reader.read(HEADER.size))
+            payload = self._reader.read(length)
+            self.stats["replayed"] += 1
+
+        return json.loads(zlib.decompress(payload))
+
+
+def _record(request, response, chunks):
+    return {
+        "method": request.method,
+        "url": str(request.url),
+        "status": response.status_code,
+        "headers": [[k, v] for k, v in response.headers.multi_items() if k.lower() not in VOLATILE_HEADERS],
+        "chunks": [[round(offset, 6), base64.b64encode(chunk).decode("ascii")] for offset, chunk in chunks],
+    }
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    def __init__(self, stream, on_close):
+        self.stream = stream
+        self.on_close = on_close
+        self.chunks = []
+        self.started = time.perf_counter()
+
+    def __iter__(self):
+        for chunk in self.stream:
+            self.chunks.append((time.perf_counter() - self.started, chunk))
+            yield chunk
+
+    def close(self):
+        self.stream.close()
+        self.on_close(self.chunks)
+
+
+class _AsyncRecordingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, on_close):
+        self.stream = stream
+        self.on_close = on_close
+        self.chunks = []
+        self.started = time.perf_counter()
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            self.chunks.append((time.perf_counter() - self.started, chunk))
+            yield chunk
+
+    async def aclose(self):
+        await self.stream.aclose()
+        self.on_close(self.chunks)
+
+
+class _ReplayStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    def __init__(self, chunks, realtime):
+        self.chunks = chunks
+        self.realtime = realtime
+
+    def __iter__(self):
+        started = time.perf_counter()
+        for offset, chunk in self.chunks:
+            if self.realtime:
+                delay = offset - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield base64.b64decode(chunk)
+
+    async def __aiter__(self):
+        started = time.perf_counter()
+        for offset, chunk in self.chunks:
+            if self.realtime:
+                delay = offset - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield base64.b64decode(chunk)
+
+
+def _replay(cassette, request, realtime):
+    request.read()
+    try:
+        record = cassette.lookup(request_key(request))
+    except CassetteMiss:
+        raise CassetteMiss(f"No recording for {request.method} {request.url} in {cassette.path}") from None
+    return httpx.Response(
+        status_code=record["status"],
+        headers=record["headers"],
+        stream=_ReplayStream(record["chunks"], realtime),
+        request=request,
+    )
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """
+    Send requests through the wrapped transport and append every response to the cassette once
+    its body has been consumed.
+    """
+
+    def __init__(self, cassette, transport=None):
+        self.cassette = cassette
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request):
+        request.read()
+        key = request_key(request)
+        response = self.transport.handle_request(request)
+
+        def on_close(chunks):
+            self.cassette.append(key, _record(request, response, chunks))
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, on_close),
+            extensions=response.extensions,
+        )
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Async counterpart of RecordingTransport.
+    """
+
+    def __init__(self, cassette, transport=None):
+        self.cassette = cassette
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        await request.aread()
+        key = request_key(request)
+        response = await self.transport.handle_async_request(request)
+
+        def on_close(chunks):
+            self.cassette.append(key, _record(request, response, chunks))
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_AsyncRecordingStream(response.stream, on_close),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """
+    Answer requests from the cassette without touching the network.
+    """
+
+    def __init__(self, cassette, realtime=False):
+        self.cassette = cassette
+        self.realtime = realtime
+
+    def handle_request(self, request):
+        return _replay(self.cassette, request, self.realtime)
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Async counterpart of ReplayTransport.
+    """
+
+    def __init__(self, cassette, realtime=False):
+        self.cassette = cassette
+        self.realtime = realtime
+
+    async def handle_async_request(self, request):
+        await request.aread()
+        return _replay(self.cassette, request, self.realtime)
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def cassette_from_env():
+    """
+    Return (cassette, mode) from OPENAI_CASSETTE/OPENAI_CASSETTE_MODE, or (None, None) when
+    recording is not enabled. Clients configured from the same path share one Cassette.
+    """
+    path = os.getenv("OPENAI_CASSETTE", "").strip()
+    if not path:
+        return None, None
+    mode = os.getenv("OPENAI_CASSETTE_MODE", "replay").strip()
+    if mode not in MODES:
+        raise ValueError(f"OPENAI_CASSETTE_MODE must be one of {', '.join(MODES)}, got {mode!r}")
+
+    path = os.path.abspath(os.path.expanduser(path))
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette(path)
+        return _cassettes[path], mode
+
+
+def sync_transport(transport):
+    """
+    Wrap transport for the cassette mode configured in the environment.
+    """
+    cassette, mode = cassette_from_env()
+    if cassette is None:
+        return transport
+    if mode == "record":
+        return RecordingTransport(cassette, transport)
+    return ReplayTransport(cassette, realtime=mode == "realtime")
+
+
+def async_transport(transport):
+    """
+    Async counterpart of sync_transport.
+    """
+    cassette, mode = cassette_from_env()
+    if cassette is None:
+        return transport
+    if mode == "record":
+        return AsyncRecordingTransport(cassette, transport)
+    return AsyncReplayTransport(cassette, realtime=mode == "realtime")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the requests recorded in a cassette")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    cassette = Cassette(args.path)
+    for key, offsets in cassette.index.items():
+        for _ in offsets:
+            record = cassette.lookup(key)
+            duration = record["chunks"][-1][0] if record["chunks"] else 0.0
+            print(f"{record['status']} {record['method']} {record['url']} "
+                  f"chunks={len(record['chunks'])} duration={duration:.2f}s")
+    print(f"{len(cassette)} recordings, {os.path.getsize(args.path)} bytes")
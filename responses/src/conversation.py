@@ -0,0 +1,207 @@
+"""
+Multi-turn conversations on top of client.responses.create.
+
+Sending the full input list on every turn makes each request larger than the last, and the
+server has to parse (and, without a prefix cache, process) the whole conversation again. When
+the backend stores responses (OpenAI, or Llama Stack with its responses_store), a Conversation
+sends only the new input items and chains the turn to the previous one with
+previous_response_id.
+
+The conversation is also kept locally as one delta per turn: the items the turn added (its input
+and the model's output converted to input items), each JSON-encoded once. When the backend does
+not store responses, or a chained response has expired, the full history is rebuilt from the
+deltas and resent. With history_path set, deltas are appended to a JSON lines file so a
+conversation can be resumed, including its last response id, without rewriting earlier turns.
+
+Every turn records the request bytes actually sent, the bytes a full resend would have taken and
+its latency; see report().
+"""
+
+import argparse
+import json
+import os
+import time
+
+from openai import NOT_GIVEN, NotFoundError
+
+from openai_clients import get_openai_client
+
+
+def _encode(item):
+    return json.dumps(item, separators=(",", ":"), ensure_ascii=False)
+
+
+def _input_items(input):
+    if isinstance(input, str):
+        return [{"role": "user", "content": input}]
+    return [item if isinstance(item, dict) else item.model_dump(exclude_none=True) for item in input]
+
+
+def output_to_input(response):
+    """
+    The response's output items in the form they are sent back as input. Reasoning items are
+    dropped, since they can only be replayed with encrypted content.
+    """
+    items = []
+    for output in response.output:
+        if output.type == "message":
+            text = "".join(part.text for part in output.content if part.type == "output_text")
+            items.append({"role": "assistant", "content": text})
+        elif output.type == "function_call":
+            items.append({
+                "type": "function_call",
+                "call_id": output.call_id,
+                "name": output.name,
+                "arguments": output.arguments,
+            })
+        elif output.type != "reasoning":
+            items.append(output.model_dump(exclude_none=True))
+    return items
+
+
+class Conversation:
+    """
+    A conversation with one model. send() takes the new input of a turn (a string or a list of
+    items such as user messages or function_call_output items) and returns the response;
+    keyword arguments given here are used for every turn.
+
+    With chain=True turns are linked with previous_response_id. If the first chained request
+    for a response created by this conversation fails with 404, the backend does not store
+    responses and the conversation switches to resending the local history. Any other 404 (an
+    expired or deleted response, or a resumed one) resends the history for that turn only.
+    """
+
+    def __init__(self, client, model, chain=True, history_path=None, **defaults):
+        self.client = client
+        self.model = model
+        self.defaults = defaults
+        self.chain = chain and defaults.get("store", True) is not False
+        self.chained_ok = False
+        self.previous_response_id = None
+        self.resumed_response_id = None
+        self.history_path = history_path
+
+        self.deltas = []        # one list of encoded items per turn
+        self.history_bytes = 2  # length of the encoded history as a JSON array ("[]")
+        self.stats = []
+
+        if history_path and os.path.exists(history_path):
+            self._load(history_path)
+            self.resumed_response_id = self.previous_response_id
+
+    @property
+    def history(self):
+        """
+        The full conversation as input items.
+        """
+        return [json.loads(item) for delta in self.deltas for item in delta]
+
+    def _load(self, path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                self._append([_encode(item) for item in record["items"]])
+                self.previous_response_id = record.get("response_id")
+
+    def _append(self, encoded, response_id=None):
+        self.deltas.append(encoded)
+        self.history_bytes += sum(len(item.encode("utf-8")) for item in encoded) + len(encoded)
+        if self.history_path and response_id is not None:
+            with open(self.history_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"response_id": response_id, "items": [json.loads(i) for i in encoded]}) + "\n")
+
+    def _create(self, input, previous_response_id, kwargs):
+        started = time.perf_counter()
+        raw = self.client.responses.with_raw_response.create(
+            model=self.model,
+            input=input,
+            previous_response_id=previous_response_id or NOT_GIVEN,
+            **{**self.defaults, **kwargs},
+        )
+        response = raw.parse()
+        return response, len(raw.http_request.content), time.perf_counter() - started
+
+    def send(self, input, **kwargs):
+        """
+        Send one turn and return the response. Streaming is not supported.
+        """
+        new_items = _input_items(input)
+        encoded = [_encode(item) for item in new_items]
+
+        mode = "full"
+        if self.chain and self.previous_response_id:
+            try:
+                response, sent, elapsed = self._create(new_items, self.previous_response_id, kwargs)
+                mode = "chained"
+                self.chained_ok = True
+            except NotFoundError:
+                if not self.chained_ok and self.previous_response_id != self.resumed_response_id:
+                    self.chain = False
+                mode = "fallback"
+
+        if mode != "chained":
+            response, sent, elapsed = self._create(self.history + new_items, None, kwargs)
+
+        # Bytes the same request would have taken with the full history as input and no
+        # previous_response_id; httpx encodes JSON bodies compactly, like _encode()
+        full_bytes = sent
+        if mode == "chained":
+            previous_field = len(f',"previous_response_id":{_encode(self.previous_response_id)}'.encode("utf-8"))
+            full_bytes += self.history_bytes - 2 - previous_field
+        self.stats.append({
+            "turn": len(self.stats) + 1,
+            "mode": mode,
+            "request_bytes": sent,
+            "full_bytes": full_bytes,
+            "latency_s": elapsed,
+            "input_tokens": getattr(response.usage, "input_tokens", None),
+        })
+
+        self._append(encoded + [_encode(item) for item in output_to_input(response)], response.id)
+        self.previous_response_id = response.id
+        return response
+
+    def report(self):
+        """
+        Print request bytes and latency per turn, with the bytes saved by chaining.
+        """
+        print(f"{'turn':>5} {'mode':<9}{'sent B':>9}{'full B':>9}{'saved B':>9}{'latency ms':>12}")
+        for turn in self.stats:
+            print(f"{turn['turn']:>5} {turn['mode']:<9}{turn['request_bytes']:>9}{turn['full_bytes']:>9}"
+                  f"{turn['full_bytes'] - turn['request_bytes']:>9}{turn['latency_s'] * 1000:>12.1f}")
+        sent = sum(t["request_bytes"] for t in self.stats)
+        full = sum(t["full_bytes"] for t in self.stats)
+        if full:
+            print(f"Sent {sent:,} bytes instead of {full:,} ({1 - sent / full:.0%} saved)")
+
+
+def run(client, model, chain, turns):
+    conversation = Conversation(client, model, chain=chain)
+    for i in range(turns):
+        conversation.send(f"Tell me one more fact about the Eiffel Tower (fact {i + 1}).")
+    return conversation
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare chained and full-history multi-turn conversations")
+    parser.add_argument("--base-url", default=None, help="Defaults to OPENAI_BASE_URL")
+    parser.add_argument("--model", default="gpt-4o")
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    client = get_openai_client(base_url=args.base_url)
+    # Warm up the connection and response parsing so turn 1 is comparable
+    client.responses.create(model=args.model, input="Hello")
+
+    print("Full history resent every turn")
+    full = run(client, args.model, False, args.turns)
+    full.report()
+
+    print("\nChained with previous_response_id")
+    chained = run(client, args.model, True, args.turns)
+    chained.report()
+
+    print(f"\n{'turn':>5}{'full ms':>10}{'chained ms':>12}{'saved ms':>10}")
+    for a, b in zip(full.stats, chained.stats):
+        print(f"{a['turn']:>5}{a['latency_s'] * 1000:>10.1f}{b['latency_s'] * 1000:>12.1f}"
+              f"{(a['latency_s'] - b['latency_s']) * 1000:>10.1f}")
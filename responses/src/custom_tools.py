@@ -2,8 +2,24 @@
 Custom function tools.
 """
 
-def get_weather(location: str, unit: str = "fahrenheit") -> dict:
-    """Simulate getting weather for a location."""
+import math
+from typing import Literal
+
+from distance import ENGINE, MILES_TO_KM
+
+
+def _city_key(name):
+    # Same matching as the distance index: case and whitespace are ignored
+    return " ".join(name.split()).casefold()
+
+def get_weather(location: str, unit: Literal["fahrenheit", "celsius"] = "fahrenheit") -> dict:
+    """
+    Get current weather information for a specific location.
+
+    Args:
+        location: The city name (e.g., 'New York', 'London')
+        unit: Temperature unit
+    """
     # Mock weather data
     weather_data = {
         "New York": {"temp": 72, "condition": "Sunny"},
@@ -11,7 +27,8 @@ def get_weather(location: str, unit: str = "fahrenheit") -> dict:
         "Tokyo": {"temp": 25, "condition": "Rainy"},
         "Paris": {"temp": 18, "condition": "Partly Cloudy"},
     }
-    data = weather_data.get(location, {"temp": 70, "condition": "Unknown"})
+    weather_data = {_city_key(city): data for city, data in weather_data.items()}
+    data = weather_data.get(_city_key(location), {"temp": 70, "condition": "Unknown"})
     return {
         "location": location,
         "temperature": data["temp"],
@@ -20,7 +37,12 @@ def get_weather(location: str, unit: str = "fahrenheit") -> dict:
     }
 
 def get_time(location: str) -> dict:
-    """Simulate getting current time for a location."""
+    """
+    Get current time for a specific location.
+
+    Args:
+        location: The city name (e.g., 'New York', 'London')
+    """
     # Mock time data
     times = {
         "New York": "10:30 AM EST",
@@ -28,27 +50,27 @@ def get_time(location: str) -> dict:
         "Tokyo": "11:30 PM JST",
         "Paris": "4:30 PM CET",
     }
+    times = {_city_key(city): time for city, time in times.items()}
     return {
         "location": location,
-        "time": times.get(location, "12:00 PM UTC")
+        "time": times.get(_city_key(location), "12:00 PM UTC")
     }
 
 def calculate_distance(from_location: str, to_location: str) -> dict:
-    """Simulate calculating distance between two locations."""
-    # Mock distance data (in miles)
-    distances = {
-        ("New York", "London"): 3459,
-        ("New York", "Paris"): 3625,
-        ("London", "Paris"): 214,
-        ("Tokyo", "New York"): 6737,
-    }
-    key = (from_location, to_location)
-    reverse_key = (to_location, from_location)
-    distance = distances.get(key) or distances.get(reverse_key, 0)
+    """
+    Calculate distance between two locations.
+
+    Args:
+        from_location: Starting city name
+        to_location: Destination city name
+    """
+    miles = ENGINE.distance_miles(from_location, to_location)
+    # Unknown cities keep the previous behaviour of reporting a distance of 0
+    distance = 0 if math.isnan(miles) else round(miles)
 
     return {
         "from": from_location,
         "to": to_location,
         "distance_miles": distance,
-        "distance_km": round(distance * 1.60934, 2)
+        "distance_km": round(distance * MILES_TO_KM, 2)
     }
@@ -0,0 +1,163 @@
+"""
+Great-circle distance engine behind the calculate_distance custom tool.
+
+Cities are resolved through a case-insensitive coordinate index and distances are computed with
+a NumPy-vectorized haversine formula, so many from/to pairs can be answered in one call. Pairs
+where both cities are in the hot set are served from a precomputed symmetric distance matrix.
+"""
+
+import math
+
+import numpy as np
+
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_TO_KM = 1.60934
+
+# (latitude, longitude) in degrees
+CITY_COORDINATES = {
+    "New York": (40.7128, -74.0060),
+    "London": (51.5074, -0.1278),
+    "Paris": (48.8566, 2.3522),
+    "Tokyo": (35.6762, 139.6503),
+    "Los Angeles": (34.0522, -118.2437),
+    "Chicago": (41.8781, -87.6298),
+    "San Francisco": (37.7749, -122.4194),
+    "Seattle": (47.6062, -122.3321),
+    "Boston": (42.3601, -71.0589),
+    "Miami": (25.7617, -80.1918),
+    "Toronto": (43.6532, -79.3832),
+    "Mexico City": (19.4326, -99.1332),
+    "Sao Paulo": (-23.5505, -46.6333),
+    "Buenos Aires": (-34.6037, -58.3816),
+    "Berlin": (52.5200, 13.4050),
+    "Madrid": (40.4168, -3.7038),
+    "Rome": (41.9028, 12.4964),
+    "Amsterdam": (52.3676, 4.9041),
+    "Dublin": (53.3498, -6.2603),
+    "Zurich": (47.3769, 8.5417),
+    "Stockholm": (59.3293, 18.0686),
+    "Moscow": (55.7558, 37.6173),
+    "Istanbul": (41.0082, 28.9784),
+    "Cairo": (30.0444, 31.2357),
+    "Dubai": (25.2048, 55.2708),
+    "Mumbai": (19.0760, 72.8777),
+    "Delhi": (28.7041, 77.1025),
+    "Bangalore": (12.9716, 77.5946),
+    "Singapore": (1.3521, 103.8198),
+    "Hong Kong": (22.3193, 114.1694),
+    "Shanghai": (31.2304, 121.4737),
+    "Beijing": (39.9042, 116.4074),
+    "Seoul": (37.5665, 126.9780),
+    "Sydney": (-33.8688, 151.2093),
+    "Melbourne": (-37.8136, 144.9631),
+    "Auckland": (-36.8485, 174.7633),
+    "Johannesburg": (-26.2041, 28.0473),
+    "Lagos": (6.5244, 3.3792),
+    "Nairobi": (-1.2921, 36.8219),
+}
+
+HOT_CITIES = ["New York", "London", "Paris", "Tokyo"]
+
+
+def _normalize(name):
+    return " ".join(name.split()).casefold()
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """
+    Vectorized haversine distance; all arguments are arrays of radians.
+    """
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+class DistanceEngine:
+    """
+    Coordinate index plus batch distance computation. Unknown cities yield NaN.
+    """
+
+    def __init__(self, coordinates=CITY_COORDINATES, hot_cities=HOT_CITIES):
+        names = list(coordinates)
+        self.index = {_normalize(name): i for i, name in enumerate(names)}
+        coords = np.radians(np.array([coordinates[name] for name in names], dtype=np.float64))
+        # Row len(names) is a NaN sentinel so unknown cities need no special casing
+        self.coords = np.vstack([coords, [np.nan, np.nan]])
+        self.unknown = len(names)
+
+        # Maps a city index to its row in the hot matrix, -1 for cities outside the hot set
+        hot = self.lookup(hot_cities)
+        self.hot_position = np.full(len(names) + 1, -1, dtype=np.int64)
+        self.hot_position[hot] = np.arange(len(hot))
+        lat, lon = self.coords[hot, 0], self.coords[hot, 1]
+        self.hot_matrix = haversine_miles(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+
+        # Plain Python copies for the single-pair path, where NumPy call overhead dominates
+        self._coords = self.coords.tolist()
+        self._hot_position = self.hot_position.tolist()
+        self._hot_rows = self.hot_matrix.tolist()
+
+    def lookup(self, names):
+        unknown = self.unknown
+        index = self.index
+        return np.fromiter(
+            (index.get(_normalize(name), unknown) for name in names), dtype=np.int64, count=len(names)
+        )
+
+    def distances_miles(self, from_locations, to_locations):
+        """
+        Distances in miles for each (from, to) pair, as a float64 array.
+        """
+        src = self.lookup(from_locations)
+        dst = self.lookup(to_locations)
+
+        result = np.empty(len(src), dtype=np.float64)
+        hot_src = self.hot_position[src]
+        hot_dst = self.hot_position[dst]
+        in_hot = (hot_src >= 0) & (hot_dst >= 0)
+        result[in_hot] = self.hot_matrix[hot_src[in_hot], hot_dst[in_hot]]
+
+        cold = ~in_hot
+        if cold.any():
+            s, d = src[cold], dst[cold]
+            result[cold] = haversine_miles(
+                self.coords[s, 0], self.coords[s, 1], self.coords[d, 0], self.coords[d, 1]
+            )
+        return result
+
+    def distance_miles(self, from_location, to_location):
+        src = self.index.get(_normalize(from_location), self.unknown)
+        dst = self.index.get(_normalize(to_location), self.unknown)
+
+        hot_src, hot_dst = self._hot_position[src], self._hot_position[dst]
+        if hot_src >= 0 and hot_dst >= 0:
+            return self._hot_rows[hot_src][hot_dst]
+
+        (lat1, lon1), (lat2, lon2) = self._coords[src], self._coords[dst]
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+ENGINE = DistanceEngine()
+
+
+def batch_calculate_distance(pairs):
+    """
+    Batch form of calculate_distance: takes (from_location, to_location) pairs and returns the
+    same dicts calculate_distance would, computed in one vectorized pass.
+    """
+    from_locations = [p[0] for p in pairs]
+    to_locations = [p[1] for p in pairs]
+    miles = np.rint(np.nan_to_num(ENGINE.distances_miles(from_locations, to_locations))).astype(int)
+
+    return [
+        {
+            "from": from_location,
+            "to": to_location,
+            "distance_miles": int(distance),
+            "distance_km": round(int(distance) * MILES_TO_KM, 2),
+        }
+        for from_location, to_location, distance in zip(from_locations, to_locations, miles)
+    ]
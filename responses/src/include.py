@@ -7,7 +7,13 @@ which returns log probabilities for the generated output text.
 
 import json
 import os
-from openai import OpenAI
+import time
+from openai_clients import get_openai_client
+
+from logprobs_analytics import LogprobArrays, StreamingLogprobs, print_summary
+from stream_aggregator import StreamAggregator, sse_events
+from stream_metrics import HISTOGRAMS, StreamTimer
+from tool_registry import REGISTRY
 
 
 def test_basic_logprobs():
@@ -17,7 +23,7 @@ def test_basic_logprobs():
     Observation: When include=["message.output_text.logprobs"] is set,
     the response includes log probabilities for each token..
     """
-    client = OpenAI()
+    client = get_openai_client()
 
     print("\n=== Testing basic logprobs inclusion ===")
 
@@ -43,21 +49,41 @@ def test_basic_logprobs():
         model="gpt-4o",
         input=input_messages,
         include=["message.output_text.logprobs"],
+        # Alternatives per token, needed for the entropy below
+        top_logprobs=5,
     )
 
     print(response_with_logprobs.model_dump_json(indent=2))
 
+    print_summary(
+        "Logprobs analytics",
+        LogprobArrays.from_response(response_with_logprobs),
+        source=response_with_logprobs.output,
+    )
+
     # With logprobs and stream set to True
     print("\n3. Response stream WITH logprobs:")
-    response_with_logprobs_2 = client.responses.create(
+    started = time.perf_counter_ns()
+    # Raw event dicts instead of pydantic models; only the text deltas are handed back
+    response_with_logprobs_2 = sse_events(
+        client,
         model="gpt-4o",
         input=input_messages,
         include=["message.output_text.logprobs"],
-        stream=True,
+        top_logprobs=5,
     )
 
-    for chunk in response_with_logprobs_2:
-        print(chunk.model_dump_json(indent=2))
+    timed_stream = StreamTimer(response_with_logprobs_2, label="openai/gpt-4o", started=started, histograms=HISTOGRAMS)
+    aggregator = StreamAggregator(subscribe={"response.output_text.delta"})
+    streamed_logprobs = StreamingLogprobs()
+    for chunk in aggregator.consume(timed_stream):
+        print(chunk["delta"], end="", flush=True)
+        streamed_logprobs.add_event(chunk)
+    print()
+
+    timed_stream.print_summary()
+    aggregator.print_summary()
+    print_summary("Streamed logprobs analytics", streamed_logprobs.snapshot())
 
 
 def test_logprobs_with_function_tool_calls():
@@ -67,30 +93,9 @@ def test_logprobs_with_function_tool_calls():
     Observation: Logprobs aren't included in the model's response
     for function tools.
     """
-    client = OpenAI()
+    client = get_openai_client()
 
-    tools = [
-        {
-            "type": "function",
-            "name": "get_weather",
-            "description": "Get current weather information for a specific location",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "The city name (e.g., 'New York', 'London')",
-                    },
-                    "unit": {
-                        "type": "string",
-                        "enum": ["fahrenheit", "celsius"],
-                        "description": "Temperature unit",
-                    },
-                },
-                "required": ["location"],
-            },
-        },
-    ]
+    tools = REGISTRY.tools_for("get_weather")
 
     print("\n=== Testing logprobs with function tools ===")
 
@@ -111,7 +116,7 @@ def test_logprobs_with_builtin_tools():
     Observation: Logprobs aren't included in the model's response
     for built-in tools.
     """
-    client = OpenAI()
+    client = get_openai_client()
 
     tools = [
         { "type": "web_search" },
@@ -136,7 +141,7 @@ def test_logprobs_with_mcp_tools():
     Observation: Logprobs are included in the model's response
     for mcp tools.
     """
-    client = OpenAI()
+    client = get_openai_client()
 
     gh_token = os.getenv("GITHUB_TOKEN", "").strip()
     if not gh_token:
@@ -175,7 +180,7 @@ def test_logprobs_with_builtin_and_mcp_tools():
     1. Logprobs are included in the model's response when web search call is made before the mcp tool and there are two assistant messages.
     1. Logprobs aren't included in the model's response when mcp tool is made called before web search and there is one assistant message.
     """
-    client = OpenAI()
+    client = get_openai_client()
 
     gh_token = os.getenv("GITHUB_TOKEN", "").strip()
     if not gh_token:
@@ -227,7 +232,7 @@ def test_logprobs_with_function_and_mcp_tools():
     Observation: Logprobs aren't included in the model's response
     for function and mcp tools.
     """
-    client = OpenAI()
+    client = get_openai_client()
 
     gh_token = os.getenv("GITHUB_TOKEN", "").strip()
     if not gh_token:
@@ -235,26 +240,7 @@ def test_logprobs_with_function_and_mcp_tools():
         exit(1)
 
     tools = [
-        {
-            "type": "function",
-            "name": "get_weather",
-            "description": "Get current weather information for a specific location",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "The city name (e.g., 'New York', 'London')",
-                    },
-                    "unit": {
-                        "type": "string",
-                        "enum": ["fahrenheit", "celsius"],
-                        "description": "Temperature unit",
-                    },
-                },
-                "required": ["location"],
-            },
-        },
+        *REGISTRY.tools_for("get_weather"),
         {
             "type": "mcp",
             "server_label": "github",
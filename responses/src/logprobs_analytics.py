@@ -0,0 +1,237 @@
+"""
+Compact NumPy representation and analytics for include=["message.output_text.logprobs"].
+
+The pydantic logprob objects returned by the Responses API cost hundreds of bytes per token. Here
+tokens are stored as offsets into one text buffer and logprobs as float32 arrays, with the top
+alternatives in an (n_tokens, k) matrix padded with -inf. Perplexity, per-token entropy and
+low-confidence spans are computed vectorized, and StreamingLogprobs builds the same arrays
+incrementally from response.output_text.delta events.
+"""
+
+import math
+import sys
+
+import numpy as np
+
+
+def _get(obj, name, default=None):
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+class LogprobArrays:
+    """
+    Token logprobs of one response. Token i is text[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, text, offsets, logprobs, top_logprobs):
+        self.text = text
+        self.offsets = offsets
+        self.logprobs = logprobs
+        self.top_logprobs = top_logprobs
+
+    @classmethod
+    def from_logprobs(cls, items, top_k=None):
+        """
+        Build arrays from a list of Logprob objects (or their dict form).
+        """
+        n = len(items)
+        if top_k is None:
+            top_k = max((len(_get(item, "top_logprobs") or []) for item in items), default=0)
+
+        tokens = [_get(item, "token") for item in items]
+        offsets = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum([len(t) for t in tokens], out=offsets[1:])
+        logprobs = np.fromiter((_get(item, "logprob") for item in items), dtype=np.float32, count=n)
+
+        top = np.full((n, top_k), -np.inf, dtype=np.float32)
+        for row, item in enumerate(items):
+            alternatives = (_get(item, "top_logprobs") or [])[:top_k]
+            top[row, :len(alternatives)] = [_get(a, "logprob") for a in alternatives]
+
+        return cls("".join(tokens), offsets, logprobs, top)
+
+    @classmethod
+    def from_response(cls, response):
+        """
+        Collect the logprobs of every output_text part in a (non-streamed) response.
+        """
+        items = []
+        for output in _get(response, "output") or []:
+            if _get(output, "type") != "message":
+                continue
+            for part in _get(output, "content") or []:
+                if _get(part, "type") == "output_text":
+                    items.extend(_get(part, "logprobs") or [])
+        return cls.from_logprobs(items)
+
+    def __len__(self):
+        return len(self.logprobs)
+
+    def token(self, i):
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+
+    @property
+    def nbytes(self):
+        return (sys.getsizeof(self.text) + self.offsets.nbytes
+                + self.logprobs.nbytes + self.top_logprobs.nbytes)
+
+    def perplexity(self):
+        if not len(self):
+            return math.nan
+        return float(np.exp(-self.logprobs.mean(dtype=np.float64)))
+
+    def entropy(self):
+        """
+        Per-token entropy (nats) of the top-k alternatives, renormalized to sum to one.
+        NaN for tokens without top_logprobs.
+        """
+        return token_entropy(self.top_logprobs)
+
+    def low_confidence_spans(self, threshold=0.5, min_tokens=1):
+        """
+        Runs of consecutive tokens whose probability is below threshold, as
+        (first_token, end_token, text) tuples.
+        """
+        return [
+            (start, end, self.text[self.offsets[start]:self.offsets[end]])
+            for start, end in low_confidence_runs(self.logprobs, threshold, min_tokens)
+        ]
+
+    def summary(self, threshold=0.5):
+        entropy = self.entropy()
+        return {
+            "tokens": len(self),
+            "perplexity": self.perplexity(),
+            "mean_entropy": float(np.nanmean(entropy)) if np.isfinite(entropy).any() else math.nan,
+            "low_confidence_spans": self.low_confidence_spans(threshold),
+            "nbytes": self.nbytes,
+        }
+
+
+def token_entropy(top_logprobs):
+    probs = np.exp(top_logprobs, dtype=np.float32)
+    totals = probs.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        probs = probs / totals
+        terms = np.where(probs > 0, probs * np.log(probs), 0.0)
+    entropy = -terms.sum(axis=1)
+    entropy[totals[:, 0] == 0] = np.nan
+    return entropy
+
+
+def low_confidence_runs(logprobs, threshold, min_tokens=1):
+    below = np.concatenate(([0], (logprobs < math.log(threshold)).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(below))
+    starts, ends = edges[0::2], edges[1::2]
+    keep = (ends - starts) >= min_tokens
+    return list(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+
+class StreamingLogprobs:
+    """
+    Incrementally builds LogprobArrays from streamed response.output_text.delta events, keeping
+    a running perplexity and computing entropy only for the newly arrived tokens. The width of
+    the top alternatives matrix starts at top_k and grows to the widest chunk seen.
+    """
+
+    def __init__(self, top_k=0, capacity=256):
+        self.top_k = top_k
+        self.size = 0
+        self.logprobs = np.empty(capacity, dtype=np.float32)
+        self.top_logprobs = np.full((capacity, top_k), -np.inf, dtype=np.float32)
+        self.entropies = np.empty(capacity, dtype=np.float32)
+        self.offsets = [0]
+        self.chunks = []
+        self.text_length = 0
+        self.logprob_sum = 0.0
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        capacity = len(self.logprobs)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.logprobs = np.resize(self.logprobs, capacity)
+        self.entropies = np.resize(self.entropies, capacity)
+        self._resize_top(capacity, self.top_k)
+
+    def _resize_top(self, capacity, top_k):
+        top = np.full((capacity, top_k), -np.inf, dtype=np.float32)
+        top[:self.size, :self.top_k] = self.top_logprobs[:self.size]
+        self.top_logprobs = top
+        self.top_k = top_k
+
+    def add(self, items):
+        """
+        Append a chunk of Logprob objects; returns the new tokens' logprobs and entropies.
+        """
+        n = len(items)
+        if not n:
+            return self.logprobs[:0], self.entropies[:0]
+        self._reserve(n)
+
+        start, end = self.size, self.size + n
+        chunk = LogprobArrays.from_logprobs(items)
+        chunk_k = chunk.top_logprobs.shape[1]
+        if chunk_k > self.top_k:
+            self._resize_top(len(self.logprobs), chunk_k)
+        self.logprobs[start:end] = chunk.logprobs
+        self.top_logprobs[start:end] = -np.inf
+        self.top_logprobs[start:end, :chunk_k] = chunk.top_logprobs
+        self.entropies[start:end] = token_entropy(chunk.top_logprobs)
+
+        self.chunks.append(chunk.text)
+        self.offsets.extend((chunk.offsets[1:] + self.text_length).tolist())
+        self.text_length += len(chunk.text)
+        self.logprob_sum += float(chunk.logprobs.sum(dtype=np.float64))
+        self.size = end
+        return self.logprobs[start:end], self.entropies[start:end]
+
+    def add_event(self, event):
+        if _get(event, "type") == "response.output_text.delta":
+            return self.add(_get(event, "logprobs") or [])
+        return None
+
+    def perplexity(self):
+        return math.exp(-self.logprob_sum / self.size) if self.size else math.nan
+
+    def snapshot(self):
+        return LogprobArrays(
+            "".join(self.chunks),
+            np.asarray(self.offsets, dtype=np.int32),
+            self.logprobs[:self.size].copy(),
+            self.top_logprobs[:self.size].copy(),
+        )
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Approximate memory held by an object tree, used to compare against LogprobArrays.nbytes.
+    """
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def print_summary(label, arrays, source=None, threshold=0.5):
+    summary = arrays.summary(threshold)
+    print(f"{label}: tokens={summary['tokens']} perplexity={summary['perplexity']:.3f} "
+          f"mean_entropy={summary['mean_entropy']:.3f} nbytes={summary['nbytes']}", end="")
+    if source is not None:
+        print(f" (pydantic objects: {deep_sizeof(source)} bytes)", end="")
+    print()
+    for start, end, text in summary["low_confidence_spans"]:
+        print(f"  low confidence tokens {start}-{end}: {text!r}")
@@ -4,86 +4,35 @@ Examples used to explore OpenAI Responses API behavior with max_tool_call.
 
 import json
 import os
-from openai import OpenAI
+from openai_clients import get_openai_client
+
+from conversation import Conversation
+from tool_loop import run_tool_loop
+from tool_registry import REGISTRY
+
+FUNCTION_TOOLS = REGISTRY.tools
+
+TRAVEL_QUERY = [
+    {
+        "role": "user",
+        "content": "I'm planning to travel from New York to Paris. Can you tell me the weather in both cities, the current time, and how far apart they are?"
+    }
+]
 
 def test_function_tools():
     """
     Observation: max_tool_calls does not impact function tools.
     """
 
-    client = OpenAI()
-
-    tools = [
-        {
-            "type": "function",
-            "name": "get_weather",
-            "description": "Get current weather information for a specific location",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "The city name (e.g., 'New York', 'London')",
-                    },
-                    "unit": {
-                        "type": "string",
-                        "enum": ["fahrenheit", "celsius"],
-                        "description": "Temperature unit",
-                    },
-                },
-                "required": ["location"],
-            },
-        },
-        {
-            "type": "function",
-            "name": "get_time",
-            "description": "Get current time for a specific location",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "The city name (e.g., 'New York', 'London')",
-                    },
-                },
-                "required": ["location"],
-            },
-        },
-        {
-            "type": "function",
-            "name": "calculate_distance",
-            "description": "Calculate distance between two locations",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "from_location": {
-                        "type": "string",
-                        "description": "Starting city name",
-                    },
-                    "to_location": {
-                        "type": "string",
-                        "description": "Destination city name",
-                    },
-                },
-                "required": ["from_location", "to_location"],
-            },
-        },
-    ]
-
-    # Create a user query that requires multiple tool calls
-    input_messages = [
-        {
-            "role": "user",
-            "content": "I'm planning to travel from New York to Paris. Can you tell me the weather in both cities, the current time, and how far apart they are?"
-        }
-    ]
+    client = get_openai_client()
 
     print("Testing function tool calling with max_tool_calls=1")
 
+    # A user query that requires multiple tool calls
     response = client.responses.create(
         model="gpt-4o",
-        input=input_messages,
-        tools=tools,
+        input=TRAVEL_QUERY,
+        tools=FUNCTION_TOOLS,
         max_tool_calls=1,
     )
 
@@ -93,12 +42,41 @@ def test_function_tools():
 
     # print(response.model_dump_json(indent=2))
 
+def test_function_tools_executed():
+    """
+    Execute the function calls returned by the model and send their outputs back.
+
+    Observation: all calls made in one model turn run concurrently and are answered in a
+    single follow-up request; max_tool_calls is enforced by the client-side loop. The rounds
+    are chained with previous_response_id, so follow-ups only send the tool outputs.
+    """
+
+    client = get_openai_client()
+
+    for max_calls in (None, 2):
+        print(f"Testing executed function tool calls with client-side max_tool_calls={max_calls}")
+
+        conversation = Conversation(client, "gpt-4o")
+        response, stats = run_tool_loop(
+            client,
+            model="gpt-4o",
+            input_messages=TRAVEL_QUERY,
+            tools=FUNCTION_TOOLS,
+            max_tool_calls=max_calls,
+            conversation=conversation,
+        )
+
+        print(f"Tool rounds: {len(stats['rounds'])}, executed calls: {stats['executed']}, "
+              f"rejected calls: {stats['rejected']}, answered from the tool memo: {stats['collapsed']}")
+        print(response.output_text)
+        conversation.report()
+
 def test_builtin_tools():
     """
     Observation: max_tool_calls impacts number of calls made to web_search.
     """
 
-    client = OpenAI()
+    client = get_openai_client()
 
     try:
         print("Testing built-in tool calling with max_tool_calls=1")
@@ -130,7 +108,7 @@ def test_mcp_tools():
        branches and the second lists commits.
     """
 
-    client = OpenAI()
+    client = get_openai_client()
 
     gh_token = os.getenv("GITHUB_TOKEN", "").strip()
     if not gh_token:
@@ -194,6 +172,8 @@ if __name__ == "__main__":
 
     test_function_tools()
 
+    test_function_tools_executed()
+
     test_builtin_tools()
 
     test_mcp_tools()
@@ -0,0 +1,96 @@
+"""
+Process-wide OpenAI client factory.
+
+Constructing OpenAI() in every function creates a new httpx connection pool each time, so every
+experiment pays a fresh TCP (and TLS) handshake and re-parses its configuration. The factory
+returns one client per base_url/api_key pair, and all of them share a single keep-alive
+connection pool (httpx pools connections per origin, so one pool serves every provider).
+
+Set OPENAI_CLIENT_HTTP2=1 to negotiate HTTP/2 where the server supports it; this needs the
+optional h2 package and falls back to HTTP/1.1 without it. Shared clients must not be closed by
+callers.
+
+Set OPENAI_CASSETTE (and OPENAI_CASSETTE_MODE) to record or replay all traffic of the shared
+clients; see cassette.py.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from cassette import async_transport, sync_transport
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+TIMEOUT = httpx.Timeout(timeout=600, connect=5.0)
+LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+
+_lock = threading.Lock()
+_http_client = None
+_clients = {}
+# Async connections belong to the event loop that opened them, so async pools are per loop
+_async_http_clients = weakref.WeakKeyDictionary()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _http2_enabled():
+    if os.getenv("OPENAI_CLIENT_HTTP2", "").strip() not in ("1", "true"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        print("OPENAI_CLIENT_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _key(base_url, api_key):
+    base_url = base_url or os.getenv("OPENAI_BASE_URL") or DEFAULT_BASE_URL
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    return base_url, api_key
+
+
+def get_openai_client(base_url=None, api_key=None):
+    """
+    Shared OpenAI client for base_url/api_key; both default to the OPENAI_* environment variables
+    like OpenAI() does.
+    """
+    global _http_client
+
+    key = _key(base_url, api_key)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            if _http_client is None:
+                transport = httpx.HTTPTransport(limits=LIMITS, http2=_http2_enabled())
+                _http_client = httpx.Client(
+                    timeout=TIMEOUT, transport=sync_transport(transport), follow_redirects=True
+                )
+            client = OpenAI(base_url=key[0], api_key=key[1], http_client=_http_client)
+            _clients[key] = client
+        return client
+
+
+def get_async_openai_client(base_url=None, api_key=None):
+    """
+    Shared AsyncOpenAI client for base_url/api_key within the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    key = _key(base_url, api_key)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            http_client = _async_http_clients.get(loop)
+            if http_client is None:
+                transport = httpx.AsyncHTTPTransport(limits=LIMITS, http2=_http2_enabled())
+                http_client = httpx.AsyncClient(
+                    timeout=TIMEOUT, transport=async_transport(transport), follow_redirects=True
+                )
+                _async_http_clients[loop] = http_client
+            client = AsyncOpenAI(base_url=key[0], api_key=key[1], http_client=http_client)
+            clients[key] = client
+        return client
@@ -0,0 +1,196 @@
+"""
+Benchmark reasoning workloads across inference providers.
+
+Runs the provider x API (Responses vs Chat Completions) x reasoning_effort matrix from
+reasoning_responses.py and reasoning_chat_completions.py concurrently, with a concurrency limit per
+provider, and repeats each cell N times. Every request's latency, reasoning and output token counts
+and throughput are written to a JSON lines file, followed by a comparison table per cell.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from openai_clients import get_async_openai_client
+from reasoning_chat_completions import MESSAGES
+from reasoning_responses import INPUT
+
+
+PROVIDERS = {
+    "lls": {
+        "base_urls": {
+            "responses": "http://localhost:8321/v1/",
+            "chat": "http://localhost:8321/v1/openai/v1",
+        },
+        "api_key": "random",
+        "model": "ollama/gpt-oss:latest",
+        "max_tokens": 200,
+        "concurrency": 4,
+    },
+    "ollama": {
+        "base_urls": {
+            "responses": "http://localhost:11434/v1/",
+            "chat": "http://localhost:11434/v1",
+        },
+        "api_key": "random",
+        "model": "gpt-oss:latest",
+        "max_tokens": 200,
+        "concurrency": 2,
+    },
+    "openai": {
+        "base_urls": {"responses": None, "chat": None},
+        "api_key": None,
+        "model": "gpt-5-nano",
+        "max_tokens": 400,
+        "concurrency": 8,
+    },
+    "vllm": {
+        "base_urls": {
+            "responses": "http://localhost:8000/v1",
+            "chat": "http://localhost:8000/v1",
+        },
+        "api_key": "random",
+        "model": "Qwen/Qwen3-0.6B",
+        "max_tokens": 200,
+        "concurrency": 8,
+    },
+}
+
+
+async def call_responses(client, provider, effort):
+    response = await client.responses.create(
+        model=provider["model"],
+        input=INPUT,
+        reasoning={"effort": effort},
+        max_output_tokens=provider["max_tokens"],
+    )
+    usage = response.usage
+    details = usage.output_tokens_details if usage else None
+    return (
+        usage.output_tokens if usage else None,
+        details.reasoning_tokens if details else None,
+    )
+
+
+async def call_chat(client, provider, effort):
+    response = await client.chat.completions.create(
+        model=provider["model"],
+        messages=MESSAGES,
+        reasoning_effort=effort,
+        max_completion_tokens=provider["max_tokens"],
+    )
+    usage = response.usage
+    details = usage.completion_tokens_details if usage else None
+    return (
+        usage.completion_tokens if usage else None,
+        details.reasoning_tokens if details else None,
+    )
+
+
+CALLS = {"responses": call_responses, "chat": call_chat}
+
+EFFORT_ORDER = {"minimal": 0, "low": 1, "medium": 2, "high": 3}
+
+
+async def run_cell(client, semaphore, name, api, effort, repeat):
+    provider = PROVIDERS[name]
+    result = {"provider": name, "api": api, "effort": effort, "repeat": repeat, "model": provider["model"]}
+
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            output_tokens, reasoning_tokens = await CALLS[api](client, provider, effort)
+            result.update(output_tokens=output_tokens, reasoning_tokens=reasoning_tokens, error=None)
+        except Exception as e:
+            result.update(output_tokens=None, reasoning_tokens=None, error=str(e))
+        result["latency_s"] = time.perf_counter() - started
+
+    if result["output_tokens"]:
+        result["tokens_per_s"] = result["output_tokens"] / result["latency_s"]
+    else:
+        result["tokens_per_s"] = None
+    return result
+
+
+async def run_matrix(providers, apis, efforts, repeats, output):
+    tasks = []
+    for name in providers:
+        provider = PROVIDERS[name]
+        semaphore = asyncio.Semaphore(provider["concurrency"])
+        for api in apis:
+            client = get_async_openai_client(
+                base_url=provider["base_urls"][api],
+                api_key=provider["api_key"],
+            )
+            for effort in efforts:
+                for repeat in range(repeats):
+                    tasks.append(run_cell(client, semaphore, name, api, effort, repeat))
+
+    results = []
+    with open(output, "w", encoding="utf-8") as f:
+        for finished in asyncio.as_completed(tasks):
+            result = await finished
+            f.write(json.dumps(result) + "\n")
+            f.flush()
+            results.append(result)
+
+    return results
+
+
+def mean(values):
+    values = [v for v in values if v is not None]
+    return statistics.fmean(values) if values else None
+
+
+def print_table(results):
+    cells = {}
+    for result in results:
+        cells.setdefault((result["provider"], result["api"], result["effort"]), []).append(result)
+
+    def fmt(value, spec=".1f"):
+        return "n/a" if value is None else format(value, spec)
+
+    print(f"{'provider':<8} {'api':<10} {'effort':<7} {'ok':>5} {'p50 s':>7} {'max s':>7} "
+          f"{'reason tok':>10} {'out tok':>8} {'tok/s':>7}")
+    ordered = sorted(cells.items(), key=lambda c: (c[0][0], c[0][1], EFFORT_ORDER.get(c[0][2], 99)))
+    for (provider, api, effort), rows in ordered:
+        ok = [r for r in rows if r["error"] is None]
+        latencies = [r["latency_s"] for r in ok]
+        print(f"{provider:<8} {api:<10} {effort:<7} {f'{len(ok)}/{len(rows)}':>5} "
+              f"{fmt(statistics.median(latencies) if latencies else None, '.2f'):>7} "
+              f"{fmt(max(latencies) if latencies else None, '.2f'):>7} "
+              f"{fmt(mean(r['reasoning_tokens'] for r in ok)):>10} "
+              f"{fmt(mean(r['output_tokens'] for r in ok)):>8} "
+              f"{fmt(mean(r['tokens_per_s'] for r in ok)):>7}")
+
+    errors = {r["error"] for r in results if r["error"]}
+    for error in errors:
+        print(f"Error: {error}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark reasoning across inference providers")
+    parser.add_argument("--providers", default="lls,ollama,openai,vllm")
+    parser.add_argument("--apis", default="responses,chat")
+    parser.add_argument("--efforts", default="low,medium,high")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default="reasoning_benchmark.jsonl")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    providers = args.providers.split(",")
+
+    if "openai" in providers and not os.getenv("OPENAI_API_KEY", "").strip():
+        print("OPENAI_API_KEY is not set in env")
+        exit(1)
+
+    results = asyncio.run(run_matrix(
+        providers, args.apis.split(","), args.efforts.split(","), args.repeats, args.output,
+    ))
+    print_table(results)
+    print(f"Results written to {args.output}")
@@ -4,7 +4,7 @@ Examples used to explore Chat Completions API's reasoning object with different
 
 import json
 import os
-from openai import OpenAI
+from openai_clients import get_openai_client
 
 
 MESSAGES = [
@@ -20,7 +20,7 @@ def test_reasoning_with_ollama():
     Observation: an additional reasoning field is returned.
     """
 
-    client = OpenAI(
+    client = get_openai_client(
         base_url="http://localhost:11434/v1",
         api_key="random",
     )
@@ -42,7 +42,7 @@ def test_reasoning_with_openai():
     Observation: reasoning tokens are not returned.
     """
 
-    client = OpenAI()
+    client = get_openai_client()
 
     print("Testing reasoning with openai")
 
@@ -61,7 +61,7 @@ def test_reasoning_with_vllm():
     Observation: additional reasoning and reasoning_content (deprecated) fields are returned.
     """
 
-    client = OpenAI(
+    client = get_openai_client(
         base_url="http://localhost:8000/v1",
         api_key="random",
     )
@@ -4,7 +4,11 @@ Examples used to explore OpenAI Responses API's reasoning object with different
 
 import json
 import os
-from openai import OpenAI
+import time
+from openai_clients import get_openai_client
+
+from stream_aggregator import StreamAggregator, sse_events
+from stream_metrics import HISTOGRAMS, StreamTimer
 
 
 INPUT = "How many occurrences of letter r are in strawberry?"
@@ -15,23 +19,32 @@ def test_reasoning_with_lls():
     Observation: Llama Stack returns reasoning object in the streaming events.
     """
 
-    client = OpenAI(
+    client = get_openai_client(
         base_url="http://localhost:8321/v1/",
         api_key="random",
     )
 
     print("Testing reasoning with LLS")
 
-    response = client.responses.create(
+    started = time.perf_counter_ns()
+    response = sse_events(
+        client,
         model="ollama/gpt-oss:latest",
         input=INPUT,
         reasoning={"effort": "low"},
         max_output_tokens=200,
-        stream=True,
     )
-    
-    for chunk in response:
-        print(chunk.model_dump_json(indent=2))
+
+    timed_stream = StreamTimer(response, label="lls/ollama/gpt-oss", started=started, histograms=HISTOGRAMS)
+    aggregator = StreamAggregator(subscribe={"response.created", "response.completed"})
+    for event in aggregator.consume(timed_stream):
+        print(json.dumps(event, indent=2))
+
+    result = aggregator.result()
+    print(f"Reasoning: {result['reasoning_text']}")
+    print(f"Output: {result['output_text']}")
+    timed_stream.print_summary()
+    aggregator.print_summary()
 
 
 def test_reasoning_with_ollama():
@@ -40,7 +53,7 @@ def test_reasoning_with_ollama():
     reasoning output object.
     """
 
-    client = OpenAI(
+    client = get_openai_client(
         base_url="http://localhost:11434/v1/",
         api_key="random",
     )
@@ -62,7 +75,7 @@ def test_reasoning_with_openai():
     Observation: reasoning tokens are not returned in the output object.
     """
 
-    client = OpenAI()
+    client = get_openai_client()
 
     print("Testing reasoning with openai")
 
@@ -81,7 +94,7 @@ def test_reasoning_with_vllm():
     Observation: reasoning content is returned in the reasoning output object.
     """
 
-    client = OpenAI(
+    client = get_openai_client(
         base_url="http://localhost:8000/v1",
         api_key="random",
     )
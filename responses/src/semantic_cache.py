@@ -0,0 +1,454 @@
+"""
+Semantic response cache for chat completions and Responses.
+
+Exact-match caching misses most repeated traffic, because users ask the same question in slightly
+different words ("What is the latest on LLM and guardrails?" / "what's new with guardrails for
+LLMs"). SemanticCache embeds the prompt of single-turn requests, looks up the nearest cached
+prompt and returns the stored answer when the cosine similarity is above a threshold.
+
+Two indexes are available:
+
+- LocalIndex keeps the vectors in a numpy matrix and searches it with one matrix-vector
+  product. The default embedding is HashedNgramEmbedder (hashed word and character n-grams),
+  which needs no model and runs offline. It is lexical: it only recognizes near-verbatim repeats
+  (case, punctuation, whitespace, small typos). Paraphrases score about as high as different
+  questions that share most of their words ("weather in Paris" / "weather in Tokyo" is 0.81), so
+  it must be used with a high threshold. To match paraphrases, pass a real embedding model, such
+  as SentenceTransformerEmbedder (optional sentence-transformers package) or any callable that
+  maps a list of strings to an (n, dim) array of L2-normalized vectors.
+- VectorIOIndex stores the prompts in dedicated vector DBs through the Llama Stack vector_io
+  API (the inline Milvus provider in run.yaml), one per namespace. The server embeds prompts with
+  the vector DB's embedding model, so the local embedding function is not used, and answers are
+  kept in the chunk metadata so other processes can hit them.
+
+Both indexes search only the entries of the request's namespace, so the same prompt cached under
+many models or system prompts cannot crowd the matching entry out of the top k.
+
+Entries are evicted least-recently-used beyond max_entries and expire after ttl seconds. Only
+requests whose answer depends on the prompt alone are cached: one user message (optionally after
+system messages), no tools and no previous_response_id. The model, system prompt and sampling
+parameters are part of the cache namespace, and prompts whose numbers differ never match. The
+report shows the hit rate and the model latency avoided by hits.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+from openai.types.chat import ChatCompletion
+from openai.types.responses import Response
+
+from openai_clients import get_openai_client
+
+# Request fields that change the answer to the same prompt
+NAMESPACE_FIELDS = ("model", "instructions", "temperature", "top_p", "max_tokens", "max_output_tokens",
+                    "max_completion_tokens", "reasoning_effort", "reasoning", "response_format", "text", "seed",
+                    "stop")
+UNCACHEABLE_FIELDS = ("tools", "functions", "previous_response_id", "stream", "n")
+
+_WORD = re.compile(r"\w+")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+class HashedNgramEmbedder:
+    """
+    Feature-hashing embedding of word unigrams and bigrams and character trigrams, with
+    sublinear term frequency and L2 normalization. Deterministic across processes.
+    """
+
+    def __init__(self, dim=512):
+        self.dim = dim
+
+    def _features(self, text):
+        words = _WORD.findall(text.casefold())
+        features = list(words)
+        features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"<{word}>"
+            features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+        return features
+
+    def __call__(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                # The top bit picks the sign so collisions tend to cancel instead of adding up
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+class SentenceTransformerEmbedder:
+    """
+    Local sentence embedding model from the optional sentence-transformers package. The model is
+    downloaded once and then runs offline.
+    """
+
+    def __init__(self, model_name="all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+
+    def __call__(self, texts):
+        return self.model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+class LocalIndex:
+    """
+    In-process nearest-neighbour index over L2-normalized vectors, searched per namespace.
+    capacity is the initial size of the vector matrix, which doubles when it is full.
+    """
+
+    def __init__(self, embed=None, capacity=1024):
+        self.embed = embed or HashedNgramEmbedder()
+        self.vectors = None
+        self.valid = np.zeros(capacity, dtype=bool)
+        self.ids = [None] * capacity
+        self.slots = {}
+        self.free = list(range(capacity - 1, -1, -1))
+        self.namespace_ids = {}
+        self.slot_namespaces = np.full(capacity, -1, dtype=np.int32)
+        self.lock = threading.Lock()
+
+    def _grow(self):
+        capacity = len(self.valid)
+        self.valid = np.concatenate([self.valid, np.zeros(capacity, dtype=bool)])
+        self.slot_namespaces = np.concatenate([self.slot_namespaces, np.full(capacity, -1, dtype=np.int32)])
+        self.ids += [None] * capacity
+        self.free = list(range(2 * capacity - 1, capacity - 1, -1)) + self.free
+        if self.vectors is not None:
+            self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+
+    def search(self, text, k=4, namespace=None):
+        """
+        Up to k (entry id, similarity, metadata) tuples from namespace, best first.
+        """
+        if namespace not in self.namespace_ids:
+            return []
+        query = self.embed([text])[0]
+        with self.lock:
+            candidates = np.flatnonzero(self.valid & (self.slot_namespaces == self.namespace_ids[namespace]))
+            if not len(candidates):
+                return []
+            scores = self.vectors[candidates] @ query
+            k = min(k, len(candidates))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            return [(self.ids[candidates[i]], float(scores[i]), None) for i in best]
+
+    def add(self, entry_id, text, metadata, namespace=None):
+        vector = self.embed([text])[0]
+        with self.lock:
+            if self.vectors is None:
+                self.vectors = np.zeros((len(self.valid), vector.shape[0]), dtype=np.float32)
+            if not self.free:
+                self._grow()
+            slot = self.free.pop()
+            self.vectors[slot] = vector
+            self.valid[slot] = True
+            self.ids[slot] = entry_id
+            self.slots[entry_id] = slot
+            self.slot_namespaces[slot] = self.namespace_ids.setdefault(namespace, len(self.namespace_ids))
+
+    def remove(self, entry_id):
+        with self.lock:
+            slot = self.slots.pop(entry_id, None)
+            if slot is not None:
+                self.valid[slot] = False
+                self.ids[slot] = None
+                self.slot_namespaces[slot] = -1
+                self.free.append(slot)
+
+
+class VectorIOIndex:
+    """
+    Index backed by dedicated Llama Stack vector DBs, one per namespace, named vector_db_id
+    followed by a prefix of the namespace hash. vector_io has no per-chunk delete, so evicted
+    entries are remembered and skipped, and chunks are inserted with the cache TTL for providers
+    that expire them.
+    """
+
+    def __init__(self, client, vector_db_id="semantic-response-cache", embedding_model="nomic-embed-text",
+                 embedding_dimension=768, provider_id="milvus", ttl=None):
+        self.client = client
+        self.vector_db_id = vector_db_id
+        self.embedding_model = embedding_model
+        self.embedding_dimension = embedding_dimension
+        self.provider_id = provider_id
+        self.ttl = ttl
+        self.evicted = set()
+        self.registered = {db.identifier for db in client.vector_dbs.list()}
+        self.lock = threading.Lock()
+
+    def _vector_db(self, namespace):
+        vector_db_id = f"{self.vector_db_id}-{namespace[:16]}" if namespace else self.vector_db_id
+        with self.lock:
+            if vector_db_id in self.registered:
+                return vector_db_id
+            # Another process may have registered it since
+            self.registered = {db.identifier for db in self.client.vector_dbs.list()}
+            if vector_db_id in self.registered:
+                return vector_db_id
+            self.client.vector_dbs.register(
+                vector_db_id=vector_db_id,
+                embedding_model=self.embedding_model,
+                embedding_dimension=self.embedding_dimension,
+                provider_id=self.provider_id,
+            )
+            self.registered.add(vector_db_id)
+        return vector_db_id
+
+    def search(self, text, k=4, namespace=None):
+        response = self.client.vector_io.query(
+            vector_db_id=self._vector_db(namespace), query=text, params={"max_chunks": k}
+        )
+        results = []
+        for chunk, score in zip(response.chunks, response.scores):
+            entry_id = chunk.metadata.get("entry_id")
+            if entry_id not in self.evicted:
+                results.append((entry_id, score, chunk.metadata))
+        return results
+
+    def add(self, entry_id, text, metadata, namespace=None):
+        chunk = {"content": text, "metadata": {"entry_id": entry_id, "document_id": entry_id, **metadata}}
+        kwargs = {"ttl_seconds": int(self.ttl)} if self.ttl else {}
+        self.client.vector_io.insert(vector_db_id=self._vector_db(namespace), chunks=[chunk], **kwargs)
+
+    def remove(self, entry_id):
+        self.evicted.add(entry_id)
+
+
+def _numbers(text):
+    return sorted(_NUMBER.findall(text))
+
+
+def _text(content):
+    if isinstance(content, str):
+        return content
+    parts = [part if isinstance(part, dict) else part.model_dump() for part in content or []]
+    return " ".join(part.get("text") or "" for part in parts)
+
+
+def _prompt_and_context(messages):
+    """
+    The user prompt and system text of a single-turn request, or None for anything else.
+    """
+    if isinstance(messages, str):
+        return messages, ""
+    system, users = [], []
+    for message in messages:
+        if not isinstance(message, dict):
+            message = message.model_dump(exclude_none=True)
+        role = message.get("role")
+        if role in ("system", "developer"):
+            system.append(_text(message.get("content")))
+        elif role == "user" and message.get("type", "message") == "message":
+            users.append(_text(message.get("content")))
+        else:
+            return None
+    if len(users) != 1:
+        return None
+    return users[0], "\n".join(system)
+
+
+class SemanticCache:
+    """
+    threshold is the minimum cosine similarity for a hit. The default suits the lexical
+    HashedNgramEmbedder, which should not go below 0.9; with a real embedding model around 0.9
+    is typical, but check it on your own traffic.
+    """
+
+    def __init__(self, index=None, threshold=0.95, max_entries=10_000, ttl=24 * 3600, clock=time.time):
+        self.index = index or LocalIndex(capacity=min(max_entries, 1024))
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # entry id -> entry dict, least recently used first
+        self.lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "bypassed": 0, "evicted": 0,
+                      "lookup_s": 0.0, "avoided_s": 0.0, "similarity": []}
+
+    def _namespace(self, api, kwargs, context):
+        fields = {name: kwargs.get(name) for name in NAMESPACE_FIELDS if kwargs.get(name) is not None}
+        blob = json.dumps([api, context, fields], sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _expired(self, entry):
+        return self.ttl is not None and entry["created_at"] + self.ttl <= self.clock()
+
+    def _evict(self, entry_id):
+        self.entries.pop(entry_id, None)
+        self.index.remove(entry_id)
+        self.stats["evicted"] += 1
+
+    def _make_room(self):
+        while len(self.entries) >= self.max_entries:
+            self._evict(next(iter(self.entries)))
+
+    def lookup(self, namespace, prompt):
+        """
+        The cached entry for a prompt in namespace, or None.
+        """
+        started = time.perf_counter()
+        numbers = _numbers(prompt)
+        found = None
+        # The search may be a network round trip (VectorIOIndex), so it runs outside the lock
+        results = self.index.search(prompt, namespace=namespace)
+        with self.lock:
+            self.stats["lookups"] += 1
+            for entry_id, score, metadata in results:
+                if score < self.threshold:
+                    break
+                entry = self.entries.get(entry_id)
+                if entry is None and metadata:
+                    # Stored by another process in the shared vector DB
+                    entry = json.loads(metadata["entry"])
+                    self._make_room()
+                    self.entries[entry_id] = entry
+                if entry is None:
+                    continue
+                if self._expired(entry):
+                    self._evict(entry_id)
+                    continue
+                if entry["namespace"] == namespace and entry["numbers"] == numbers:
+                    self.entries.move_to_end(entry_id)
+                    self.stats["similarity"].append(score)
+                    found = entry
+                    break
+        self.stats["lookup_s"] += time.perf_counter() - started
+        return found
+
+    def store(self, namespace, prompt, answer, latency_s):
+        entry_id = uuid.uuid4().hex
+        entry = {"namespace": namespace, "numbers": _numbers(prompt), "answer": answer,
+                 "latency_s": latency_s, "created_at": self.clock()}
+        self.index.add(entry_id, prompt, {"entry": json.dumps(entry)}, namespace=namespace)
+        with self.lock:
+            self._make_room()
+            self.entries[entry_id] = entry
+
+    def _cached_call(self, api, create, parse, messages, kwargs):
+        request = _prompt_and_context(messages)
+        if request is None or any(kwargs.get(name) for name in UNCACHEABLE_FIELDS):
+            self.stats["bypassed"] += 1
+            return create()
+
+        prompt, context = request
+        namespace = self._namespace(api, kwargs, context)
+        entry = self.lookup(namespace, prompt)
+        if entry is not None:
+            self.stats["hits"] += 1
+            self.stats["avoided_s"] += entry["latency_s"]
+            return parse(entry["answer"])
+
+        self.stats["misses"] += 1
+        started = time.perf_counter()
+        result = create()
+        self.store(namespace, prompt, result.model_dump(mode="json"), time.perf_counter() - started)
+        return result
+
+    def chat(self, client, **kwargs):
+        """
+        client.chat.completions.create(**kwargs), answered from the cache when possible.
+        """
+        return self._cached_call(
+            "chat", lambda: client.chat.completions.create(**kwargs), ChatCompletion.model_validate,
+            kwargs.get("messages", []), kwargs,
+        )
+
+    def responses(self, client, **kwargs):
+        """
+        client.responses.create(**kwargs), answered from the cache when possible.
+        """
+        return self._cached_call(
+            "responses", lambda: client.responses.create(**kwargs), Response.model_validate,
+            kwargs.get("input", []), kwargs,
+        )
+
+    def report(self):
+        stats = self.stats
+        cacheable = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / cacheable if cacheable else 0.0
+        lookup_ms = stats["lookup_s"] / stats["lookups"] * 1000 if stats["lookups"] else 0.0
+        print(f"Semantic cache: {stats['hits']}/{cacheable} hits ({hit_rate:.0%}), {stats['bypassed']} bypassed, "
+              f"{stats['evicted']} evicted, {len(self.entries)} entries")
+        print(f"  lookup {lookup_ms:.2f}ms, model latency avoided {stats['avoided_s']:.2f}s "
+              f"(net {stats['avoided_s'] - stats['lookup_s']:.2f}s)")
+        if stats["similarity"]:
+            print(f"  hit similarity min={min(stats['similarity']):.3f} mean={np.mean(stats['similarity']):.3f}")
+
+
+QUESTIONS = [
+    "What is the latest on LLM and guardrails?",
+    "What's the latest on LLMs and guardrails?",
+    "what is the latest news on LLM guardrails",
+    "How do I run Llama Stack locally?",
+    "How can I run Llama Stack locally?",
+    "How do I run llama stack locally ?",
+    "What is the capital of France?",
+    "what is the capital of france",
+    "What is 12 times 12?",
+    "What is 12 times 13?",
+    "Write a haiku about the ocean.",
+    "Write a haiku about the sea.",
+    # Different questions that share most of their words must not hit
+    "What is the weather in Paris?",
+    "What is the weather in Tokyo?",
+    "How do I stop Llama Stack locally?",
+    "Is it safe to mix bleach and vinegar?",
+    "Is it safe to mix bleach and ammonia?",
+]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Semantic cache for chat completions and Responses")
+    parser.add_argument("--base-url", default=None, help="Defaults to OPENAI_BASE_URL")
+    parser.add_argument("--model", default="gpt-4o")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="Minimum cosine similarity for a hit (default 0.95 for the hashed embedder, "
+                             "0.9 for an embedding model)")
+    parser.add_argument("--backend", choices=("local", "vector_io"), default="local")
+    parser.add_argument("--embedder", choices=("hashed", "sentence-transformers"), default="hashed",
+                        help="Local embedding for --backend local")
+    parser.add_argument("--stack-url", default="http://localhost:8321", help="Llama Stack URL for --backend vector_io")
+    parser.add_argument("--embedding-model", default="nomic-embed-text")
+    parser.add_argument("--embedding-dimension", type=int, default=768)
+    args = parser.parse_args()
+
+    threshold = args.threshold
+    if args.backend == "vector_io":
+        from llama_stack_client import LlamaStackClient
+
+        index = VectorIOIndex(LlamaStackClient(base_url=args.stack_url), embedding_model=args.embedding_model,
+                              embedding_dimension=args.embedding_dimension)
+        threshold = threshold or 0.9
+    elif args.embedder == "sentence-transformers":
+        index = LocalIndex(SentenceTransformerEmbedder())
+        threshold = threshold or 0.9
+    else:
+        index = LocalIndex()
+        threshold = threshold or 0.95
+
+    client = get_openai_client(base_url=args.base_url)
+    cache = SemanticCache(index=index, threshold=threshold)
+    for api in ("chat", "responses"):
+        for question in QUESTIONS:
+            started = time.perf_counter()
+            hits = cache.stats["hits"]
+            if api == "chat":
+                cache.chat(client, model=args.model, messages=[{"role": "user", "content": question}])
+            else:
+                cache.responses(client, model=args.model, input=question)
+            source = "cache" if cache.stats["hits"] > hits else "model"
+            print(f"[{api:<9}] {source:<5} {(time.perf_counter() - started) * 1000:7.1f}ms  {question}")
+    cache.report()
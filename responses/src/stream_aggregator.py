@@ -0,0 +1,184 @@
+"""
+Low-overhead consumer for Responses API event streams.
+
+client.responses.create(stream=True) validates every SSE event into a pydantic model, and the
+examples then serialize each one again with model_dump_json(indent=2). At high token rates that
+per-event work dominates CPU. sse_events() reads the raw stream through
+client.responses.with_streaming_response and yields each event as the dict json.loads produces,
+and StreamAggregator dispatches those dicts by type through a lookup table.
+
+The aggregator rebuilds the final response as the events arrive: output text, reasoning text,
+function calls and logprobs. Only the event types a caller subscribes to are yielded. Memory stays
+bounded for very long generations: text buffers keep at most max_chars (the oldest chunks are
+dropped and counted), and logprobs go into a preallocated float32 array of max_logprob_tokens
+entries, after which only the running perplexity is updated.
+"""
+
+import json
+import math
+from collections import deque
+
+import numpy as np
+
+TEXT_DELTA = "response.output_text.delta"
+REASONING_DELTAS = ("response.reasoning_text.delta", "response.reasoning_summary_text.delta")
+
+
+def sse_events(client, **create_kwargs):
+    """
+    Stream a Responses API call and yield its events as plain dicts, without model validation.
+    """
+    with client.responses.with_streaming_response.create(stream=True, **create_kwargs) as response:
+        for line in response.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            yield json.loads(data)
+
+
+class TextBuffer:
+    """
+    Append-only text buffer that keeps at most max_chars, dropping the oldest chunks.
+    """
+
+    def __init__(self, max_chars=None):
+        self.max_chars = max_chars
+        self.chunks = deque()
+        self.length = 0
+        self.dropped = 0
+
+    def append(self, chunk):
+        self.chunks.append(chunk)
+        self.length += len(chunk)
+        if self.max_chars is not None:
+            while self.length > self.max_chars and len(self.chunks) > 1:
+                removed = len(self.chunks.popleft())
+                self.length -= removed
+                self.dropped += removed
+
+    def text(self):
+        return "".join(self.chunks)
+
+
+class StreamAggregator:
+    """
+    Rebuilds the final response from raw event dicts and yields the subscribed ones.
+    """
+
+    def __init__(self, subscribe=(TEXT_DELTA,), max_chars=1_000_000, max_logprob_tokens=65_536):
+        self.subscribe = frozenset(subscribe)
+        self.text = TextBuffer(max_chars)
+        self.reasoning = TextBuffer(max_chars)
+        self.tool_calls = {}
+        self.call_keys = {}     # output_index -> key in tool_calls
+        self.logprobs = np.empty(max_logprob_tokens, dtype=np.float32)
+        self.logprob_count = 0
+        self.logprob_sum = 0.0
+        self.events = 0
+        self.response = {}
+        self.error = None
+
+        self.handlers = {
+            TEXT_DELTA: self._on_text_delta,
+            "response.output_item.added": self._on_output_item,
+            "response.output_item.done": self._on_output_item,
+            "response.function_call_arguments.delta": self._on_arguments_delta,
+            "response.function_call_arguments.done": self._on_arguments_done,
+            "response.created": self._on_response,
+            "response.completed": self._on_response,
+            "response.incomplete": self._on_response,
+            "response.failed": self._on_response,
+            "error": self._on_error,
+        }
+        for event_type in REASONING_DELTAS:
+            self.handlers[event_type] = self._on_reasoning_delta
+
+    def consume(self, events):
+        """
+        Feed an iterable of event dicts through the aggregator and yield the subscribed events.
+        """
+        handlers = self.handlers
+        subscribe = self.subscribe
+        for event in events:
+            self.events += 1
+            event_type = event["type"]
+            handler = handlers.get(event_type)
+            if handler is not None:
+                handler(event)
+            if event_type in subscribe:
+                yield event
+
+    def _on_text_delta(self, event):
+        self.text.append(event["delta"])
+        logprobs = event.get("logprobs")
+        if logprobs:
+            count = self.logprob_count
+            capacity = len(self.logprobs)
+            for item in logprobs:
+                value = item["logprob"]
+                if count < capacity:
+                    self.logprobs[count] = value
+                self.logprob_sum += value
+                count += 1
+            self.logprob_count = count
+
+    def _on_reasoning_delta(self, event):
+        self.reasoning.append(event["delta"])
+
+    def _on_output_item(self, event):
+        item = event["item"]
+        if item.get("type") != "function_call":
+            return
+        # Some providers omit the item id; the output index identifies the item as well
+        key = item.get("id") or event.get("output_index")
+        self.call_keys[event.get("output_index")] = key
+        call = self.tool_calls.setdefault(key, {"arguments": ""})
+        call.update(call_id=item.get("call_id"), name=item.get("name"))
+        if item.get("arguments"):
+            call["arguments"] = item["arguments"]
+
+    def _call_key(self, event):
+        return event.get("item_id") or self.call_keys.get(event.get("output_index"), event.get("output_index"))
+
+    def _on_arguments_delta(self, event):
+        call = self.tool_calls.setdefault(self._call_key(event), {"arguments": ""})
+        call["arguments"] += event["delta"]
+
+    def _on_arguments_done(self, event):
+        self.tool_calls.setdefault(self._call_key(event), {})["arguments"] = event["arguments"]
+
+    def _on_response(self, event):
+        # The final response repeats the whole output; keep only its metadata
+        response = event["response"]
+        self.response = {key: response.get(key) for key in ("id", "model", "status", "usage")}
+
+    def _on_error(self, event):
+        self.error = event.get("message") or event
+
+    def perplexity(self):
+        return math.exp(-self.logprob_sum / self.logprob_count) if self.logprob_count else math.nan
+
+    def result(self):
+        """
+        The response rebuilt so far.
+        """
+        return {
+            **self.response,
+            "output_text": self.text.text(),
+            "reasoning_text": self.reasoning.text(),
+            "tool_calls": list(self.tool_calls.values()),
+            "logprobs": self.logprobs[:min(self.logprob_count, len(self.logprobs))],
+            "perplexity": self.perplexity(),
+            "dropped_chars": self.text.dropped + self.reasoning.dropped,
+            "events": self.events,
+            "error": self.error,
+        }
+
+    def print_summary(self):
+        result = self.result()
+        print(f"Stream aggregate: {result['events']} events, {len(result['output_text'])} text chars, "
+              f"{len(result['reasoning_text'])} reasoning chars, {len(result['tool_calls'])} tool calls, "
+              f"{self.logprob_count} logprobs (perplexity {result['perplexity']:.3f}), "
+              f"status={result.get('status')}, usage={result.get('usage')}")
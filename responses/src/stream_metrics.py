@@ -0,0 +1,192 @@
+"""
+Latency instrumentation for streamed Responses API calls.
+
+StreamTimer wraps the event stream returned by client.responses.create(stream=True) and
+timestamps every text and reasoning delta with a monotonic clock. At the end of the stream it
+summarizes time-to-first-token (TTFT), inter-token gaps and decode throughput, and records the
+summary in StreamHistograms so distributions can be compared across many requests and providers.
+
+Each delta event is counted as one token, which matches how OpenAI, Llama Stack and vLLM emit
+text deltas. The per-event cost is one set lookup and one list append.
+"""
+
+import argparse
+import bisect
+import math
+import statistics
+import time
+
+from openai import NOT_GIVEN
+
+from openai_clients import get_openai_client
+
+
+TEXT_DELTA = "response.output_text.delta"
+REASONING_DELTAS = {"response.reasoning_text.delta", "response.reasoning_summary_text.delta"}
+DELTA_EVENTS = {TEXT_DELTA} | REASONING_DELTAS
+
+
+class StreamTimer:
+    """
+    Pass-through iterator over a Responses event stream that records when each delta arrives.
+
+    Pass started=time.perf_counter_ns() taken just before client.responses.create() so TTFT
+    includes the request round trip; otherwise the clock starts when the timer is created.
+    """
+
+    def __init__(self, stream, label="default", started=None, histograms=None):
+        self.stream = stream
+        self.label = label
+        self.started = started if started is not None else time.perf_counter_ns()
+        self.histograms = histograms
+        self.text_times = []
+        self.reasoning_times = []
+        self.finished = None
+
+    def __iter__(self):
+        clock = time.perf_counter_ns
+        text_times = self.text_times
+        reasoning_times = self.reasoning_times
+
+        for event in self.stream:
+            # Raw event dicts from stream_aggregator.sse_events are accepted as well
+            event_type = event["type"] if type(event) is dict else event.type
+            if event_type in DELTA_EVENTS:
+                if event_type == TEXT_DELTA:
+                    text_times.append(clock())
+                else:
+                    reasoning_times.append(clock())
+            yield event
+
+        self.finished = clock()
+        if self.histograms is not None:
+            self.histograms.record(self.label, self.summary())
+
+    def summary(self):
+        times = sorted(self.text_times + self.reasoning_times)
+        finished = self.finished or time.perf_counter_ns()
+        gaps_ms = [(b - a) / 1e6 for a, b in zip(times, times[1:])]
+        decode_s = (times[-1] - times[0]) / 1e9 if len(times) > 1 else 0.0
+
+        return {
+            "label": self.label,
+            "tokens": len(times),
+            "reasoning_tokens": len(self.reasoning_times),
+            "ttft_ms": (times[0] - self.started) / 1e6 if times else None,
+            "first_text_ms": (self.text_times[0] - self.started) / 1e6 if self.text_times else None,
+            "total_ms": (finished - self.started) / 1e6,
+            "gap_mean_ms": statistics.fmean(gaps_ms) if gaps_ms else None,
+            "gap_max_ms": max(gaps_ms) if gaps_ms else None,
+            "gap_jitter_ms": statistics.pstdev(gaps_ms) if gaps_ms else None,
+            "gaps_ms": gaps_ms,
+            "tokens_per_s": (len(times) - 1) / decode_s if decode_s else None,
+        }
+
+    def print_summary(self):
+        s = self.summary()
+
+        def fmt(value, unit="ms"):
+            return "n/a" if value is None else f"{value:.1f}{unit}"
+
+        print(f"[{s['label']}] tokens={s['tokens']} (reasoning={s['reasoning_tokens']}) "
+              f"ttft={fmt(s['ttft_ms'])} first_text={fmt(s['first_text_ms'])} "
+              f"total={fmt(s['total_ms'])} gap_mean={fmt(s['gap_mean_ms'])} "
+              f"gap_max={fmt(s['gap_max_ms'])} jitter={fmt(s['gap_jitter_ms'])} "
+              f"throughput={fmt(s['tokens_per_s'], ' tok/s')}")
+
+
+class Histogram:
+    """
+    Log-bucketed histogram: bucket bounds grow by `growth` per bucket, so percentiles are
+    accurate to within that ratio while memory stays constant.
+    """
+
+    def __init__(self, lowest=0.01, highest=600_000.0, growth=1.05):
+        n_buckets = math.ceil(math.log(highest / lowest) / math.log(growth)) + 1
+        self.bounds = [lowest * growth ** i for i in range(n_buckets)]
+        self.counts = [0] * (n_buckets + 1)
+        self.total = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        if not self.total:
+            return None
+        rank = math.ceil(self.total * p / 100)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                value = self.bounds[min(index, len(self.bounds) - 1)]
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+class StreamHistograms:
+    """
+    Aggregates StreamTimer summaries per label (for example, per provider).
+    """
+
+    METRICS = ("ttft_ms", "gap_ms", "tokens_per_s", "total_ms")
+
+    def __init__(self):
+        self.histograms = {}
+
+    def record(self, label, summary):
+        per_label = self.histograms.setdefault(label, {m: Histogram() for m in self.METRICS})
+        for gap in summary["gaps_ms"]:
+            per_label["gap_ms"].add(gap)
+        for metric in ("ttft_ms", "tokens_per_s", "total_ms"):
+            if summary[metric] is not None:
+                per_label[metric].add(summary[metric])
+
+    def print_report(self, percentiles=(50, 90, 99)):
+        header = "".join(f"{'p' + str(p):>10}" for p in percentiles)
+        print(f"{'label':<20} {'metric':<14} {'count':>7}{header}")
+        for label, metrics in self.histograms.items():
+            for metric, histogram in metrics.items():
+                values = "".join(
+                    f"{histogram.percentile(p):>10.1f}" if histogram.total else f"{'n/a':>10}"
+                    for p in percentiles
+                )
+                print(f"{label:<20} {metric:<14} {histogram.total:>7}{values}")
+
+
+HISTOGRAMS = StreamHistograms()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure streaming latency of the Responses API")
+    parser.add_argument("--base-url", default="http://localhost:8321/v1/")
+    parser.add_argument("--api-key", default="random")
+    parser.add_argument("--model", default="ollama/gpt-oss:latest")
+    parser.add_argument("--input", default="How many occurrences of letter r are in strawberry?")
+    parser.add_argument("--effort", help="Reasoning effort; omit for non-reasoning models")
+    parser.add_argument("--requests", type=int, default=10)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    client = get_openai_client(base_url=args.base_url, api_key=args.api_key)
+
+    for _ in range(args.requests):
+        started = time.perf_counter_ns()
+        stream = client.responses.create(
+            model=args.model,
+            input=args.input,
+            reasoning={"effort": args.effort} if args.effort else NOT_GIVEN,
+            stream=True,
+        )
+        timer = StreamTimer(stream, label=args.model, started=started, histograms=HISTOGRAMS)
+        for _ in timer:
+            pass
+        timer.print_summary()
+
+    HISTOGRAMS.print_report()
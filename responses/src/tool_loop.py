@@ -0,0 +1,160 @@
+"""
+Agent loop that executes the function tools requested by the model.
+
+Every function_call item returned in one model turn is dispatched concurrently: plain functions
+run on a thread pool and coroutine functions are gathered on an event loop. All of the resulting
+function_call_output items are then sent back in a single follow-up request, so a multi-tool
+query costs one tool round instead of one round per call.
+
+max_tool_calls is enforced on the client side, since the Responses API does not apply it to
+function tools (see test_function_tools in max_tool_calls.py). Calls beyond the budget are
+answered with an error output, and once the budget is spent the model is asked to answer
+without further tools.
+
+Arguments of registered tools are checked by the validators compiled in tool_registry.py before
+dispatch, so malformed calls are answered with an error output instead of raising inside the tool.
+
+Calls are answered through the ToolMemo in tool_memo.py by default, so duplicate calls within a
+response and calls repeated across rounds or requests do not run the tool again.
+
+Each round resends the history by default. Pass a Conversation (conversation.py) to chain the
+rounds with previous_response_id, so follow-up requests only carry the function_call_output items.
+"""
+
+import asyncio
+import inspect
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import NOT_GIVEN
+
+from conversation import Conversation
+from tool_memo import MEMO
+from tool_registry import REGISTRY, ToolArgumentError
+
+
+FUNCTIONS = REGISTRY.functions
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="tool")
+
+
+def _error(message):
+    return {"error": message}
+
+
+async def _gather(coroutines):
+    return await asyncio.gather(*coroutines, return_exceptions=True)
+
+
+def _parse_arguments(call, registry):
+    if registry is not None and call.name in registry.validators:
+        return registry.validate(call.name, call.arguments)
+    try:
+        return json.loads(call.arguments or "{}")
+    except json.JSONDecodeError as e:
+        raise ToolArgumentError(f"Invalid arguments: {e}") from None
+
+
+def execute_function_calls(calls, functions=FUNCTIONS, executor=_executor, registry=REGISTRY):
+    """
+    Run the given function_call items concurrently and return their function_call_output
+    items in the order the model requested them.
+    """
+    results = {}
+    futures = {}
+    coroutines = {}
+
+    for call in calls:
+        func = functions.get(call.name)
+        if func is None:
+            results[call.call_id] = _error(f"Unknown function: {call.name}")
+            continue
+        try:
+            arguments = _parse_arguments(call, registry)
+        except ToolArgumentError as e:
+            results[call.call_id] = _error(str(e))
+            continue
+
+        if inspect.iscoroutinefunction(func):
+            coroutines[call.call_id] = func(**arguments)
+        else:
+            futures[call.call_id] = executor.submit(func, **arguments)
+
+    if coroutines:
+        outcomes = asyncio.run(_gather(coroutines.values()))
+        for call_id, outcome in zip(coroutines, outcomes):
+            results[call_id] = _error(str(outcome)) if isinstance(outcome, BaseException) else outcome
+
+    for call_id, future in futures.items():
+        try:
+            results[call_id] = future.result()
+        except Exception as e:
+            results[call_id] = _error(str(e))
+
+    return [
+        {
+            "type": "function_call_output",
+            "call_id": call.call_id,
+            "output": json.dumps(results[call.call_id]),
+        }
+        for call in calls
+    ]
+
+
+def run_tool_loop(client, model, input_messages, tools, functions=FUNCTIONS,
+                  max_tool_calls=None, max_rounds=8, conversation=None, memo=MEMO, **create_kwargs):
+    """
+    Call the model, execute the function calls it makes and send the results back until it
+    produces a final answer. Returns the final response and per-round statistics. Pass
+    memo=None to run every call.
+    """
+    if conversation is None:
+        conversation = Conversation(client, model, chain=False)
+    pending = list(input_messages)
+    stats = {"rounds": [], "executed": 0, "rejected": 0, "collapsed": 0}
+
+    for _ in range(max_rounds):
+        budget_spent = max_tool_calls is not None and stats["executed"] >= max_tool_calls
+        response = conversation.send(
+            pending,
+            tools=tools,
+            tool_choice="none" if budget_spent else NOT_GIVEN,
+            **create_kwargs,
+        )
+
+        calls = [output for output in response.output if output.type == "function_call"]
+        if not calls:
+            return response, stats
+
+        remaining = len(calls) if max_tool_calls is None else max(0, max_tool_calls - stats["executed"])
+        allowed, rejected = calls[:remaining], calls[remaining:]
+
+        started = time.perf_counter()
+        if memo is None:
+            outputs = execute_function_calls(allowed, functions)
+            collapsed = 0
+        else:
+            ran = memo.stats["executed"]
+            outputs = memo.execute(allowed, lambda calls: execute_function_calls(calls, functions))
+            collapsed = len(allowed) - (memo.stats["executed"] - ran)
+        elapsed = time.perf_counter() - started
+
+        outputs += [
+            {
+                "type": "function_call_output",
+                "call_id": call.call_id,
+                "output": json.dumps(_error(f"max_tool_calls={max_tool_calls} reached, {call.name} was not run")),
+            }
+            for call in rejected
+        ]
+
+        stats["executed"] += len(allowed)
+        stats["rejected"] += len(rejected)
+        stats["collapsed"] += collapsed
+        stats["rounds"].append({"calls": len(calls), "executed": len(allowed), "collapsed": collapsed,
+                                "tool_seconds": elapsed})
+
+        pending = outputs
+
+    raise RuntimeError(f"No final answer after {max_rounds} tool rounds")
@@ -0,0 +1,265 @@
+"""
+Memoization of function tool calls.
+
+Multi-city prompts often make the model request the same call more than once, either inside one
+response (get_weather for "Paris" and "paris") or in a later round of the tool loop, and
+calculate_distance is asked for both directions of a pair. ToolMemo sits in front of the
+dispatch in tool_loop.py and answers those calls without running the tool again:
+
+- Arguments are normalized before they are compared: defaults are filled in from the signature,
+  string values are case-folded with whitespace collapsed, and for symmetric tools the pair of
+  arguments is sorted (the result is swapped back for the reversed direction).
+- Within one response, every call with the same normalized arguments is answered by a single
+  execution.
+- Results are also kept in a cross-request cache whose TTL depends on how quickly the data
+  changes (weather for minutes, distances until evicted). Tools without a rule are never
+  memoized.
+
+Results served from the memo echo the arguments of the call they answer, so "paris" gets back
+"paris" even when "Paris" ran the tool. The tools themselves match cities case- and
+whitespace-insensitively, so the normalized key never mixes up two different answers.
+
+Failed calls (error outputs) are not cached. report() prints how many calls were collapsed.
+"""
+
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from tool_registry import REGISTRY, ToolArgumentError
+
+_MISS = object()
+
+
+class MemoRule:
+    """
+    How one tool is memoized. ttl is the lifetime of cross-request entries in seconds (None
+    keeps them until evicted, 0 only collapses duplicates within a response). symmetric names
+    two arguments that can be swapped without changing the answer, and result_swap the two
+    result fields to swap back for the reversed direction. echo maps result fields that repeat
+    an argument to that argument's name.
+    """
+
+    def __init__(self, ttl=0.0, symmetric=None, result_swap=None, echo=None):
+        self.ttl = ttl
+        self.symmetric = symmetric
+        self.result_swap = result_swap
+        self.echo = echo or {}
+
+
+MEMO_RULES = {
+    "get_weather": MemoRule(ttl=600.0, echo={"location": "location"}),
+    # Long enough to cover the rounds of one tool loop, short enough for a clock
+    "get_time": MemoRule(ttl=30.0, echo={"location": "location"}),
+    "calculate_distance": MemoRule(
+        ttl=None, symmetric=("from_location", "to_location"), result_swap=("from", "to"),
+        echo={"from": "from_location", "to": "to_location"},
+    ),
+}
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    return value
+
+
+class ToolMemo:
+    def __init__(self, registry=REGISTRY, rules=MEMO_RULES, max_entries=1024, clock=time.monotonic):
+        self.registry = registry
+        self.rules = rules
+        self.max_entries = max_entries
+        self.clock = clock
+        self.cache = OrderedDict()  # key -> (expires_at or None, result in canonical orientation)
+        self.lock = threading.Lock()
+        self.stats = {"calls": 0, "executed": 0, "collapsed": 0, "cache_hits": 0, "expired": 0}
+        self._defaults = {}
+
+    def _defaults_for(self, name):
+        if name not in self._defaults:
+            params = inspect.signature(self.registry.functions[name]).parameters.values()
+            self._defaults[name] = {
+                p.name: p.default for p in params if p.default is not inspect.Parameter.empty
+            }
+        return self._defaults[name]
+
+    def key(self, name, arguments):
+        """
+        (key, swapped, parsed arguments) for a call, or None when the call is not memoized.
+        arguments is the raw function_call.arguments string; invalid arguments are left for the
+        dispatcher to report.
+        """
+        rule = self.rules.get(name)
+        if rule is None or name not in self.registry.functions:
+            return None
+        try:
+            parsed = self.registry.validate(name, arguments)
+        except ToolArgumentError:
+            return None
+
+        normalized = {k: _normalize(v) for k, v in {**self._defaults_for(name), **parsed}.items()}
+        swapped = False
+        if rule.symmetric:
+            a, b = rule.symmetric
+            if normalized.get(a, "") > normalized.get(b, ""):
+                normalized[a], normalized[b] = normalized[b], normalized[a]
+                swapped = True
+        return (name, tuple(sorted(normalized.items()))), swapped, parsed
+
+    def orient(self, name, result, swapped):
+        """
+        Convert a result between the canonical and the requested argument order.
+        """
+        rule = self.rules[name]
+        if not swapped or not rule.result_swap or not isinstance(result, dict):
+            return result
+        a, b = rule.result_swap
+        result = dict(result)
+        result[a], result[b] = result.get(b), result.get(a)
+        return result
+
+    def answer(self, name, result, swapped, parsed):
+        """
+        A memoized result as the answer to one call: oriented to its argument order and echoing
+        the arguments it was made with.
+        """
+        result = self.orient(name, result, swapped)
+        echo = self.rules[name].echo
+        if echo and isinstance(result, dict):
+            result = dict(result)
+            for field, argument in echo.items():
+                if field in result and argument in parsed:
+                    result[field] = parsed[argument]
+        return result
+
+    def get(self, key):
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return _MISS
+            expires_at, result = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self.cache[key]
+                self.stats["expired"] += 1
+                return _MISS
+            self.cache.move_to_end(key)
+            return result
+
+    def put(self, key, result):
+        ttl = self.rules[key[0]].ttl
+        if ttl == 0:
+            return
+        with self.lock:
+            self.cache[key] = (None if ttl is None else self.clock() + ttl, result)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+
+    def execute(self, calls, run):
+        """
+        Answer the function_call items in calls, passing only the calls that are neither cached
+        nor duplicates of an earlier call in the list to run(calls). run must return
+        function_call_output items, as tool_loop.execute_function_calls does. Outputs are
+        returned in the order of calls.
+        """
+        outputs = {}
+        keys = {}           # call_id -> (key, swapped, parsed arguments)
+        first = {}          # key -> call_id of the call that runs it
+        unique = []
+
+        for call in calls:
+            self.stats["calls"] += 1
+            memo_key = self.key(call.name, call.arguments)
+            if memo_key is None:
+                unique.append(call)
+                continue
+
+            key, swapped, parsed = memo_key
+            keys[call.call_id] = memo_key
+            cached = self.get(key)
+            if cached is not _MISS:
+                self.stats["cache_hits"] += 1
+                outputs[call.call_id] = self.answer(call.name, cached, swapped, parsed)
+            elif key in first:
+                self.stats["collapsed"] += 1
+            else:
+                first[key] = call.call_id
+                unique.append(call)
+
+        self.stats["executed"] += len(unique)
+        results = {}
+        for output in run(unique) if unique else []:
+            results[output["call_id"]] = output["output"]
+
+        for call in calls:
+            if call.call_id in results:
+                continue
+            if call.call_id in outputs:
+                results[call.call_id] = json.dumps(outputs[call.call_id])
+                continue
+            # Duplicate within this response: answer from the call that ran
+            key, swapped, parsed = keys[call.call_id]
+            source = first[key]
+            source_swapped = keys[source][1]
+            result = json.loads(results[source])
+            results[call.call_id] = json.dumps(
+                self.answer(call.name, self.orient(call.name, result, source_swapped), swapped, parsed)
+            )
+
+        for key, call_id in first.items():
+            result = json.loads(results[call_id])
+            if not (isinstance(result, dict) and "error" in result):
+                self.put(key, self.orient(key[0], result, keys[call_id][1]))
+
+        return [
+            {"type": "function_call_output", "call_id": call.call_id, "output": results[call.call_id]}
+            for call in calls
+        ]
+
+    def report(self):
+        stats = self.stats
+        saved = stats["collapsed"] + stats["cache_hits"]
+        share = saved / stats["calls"] if stats["calls"] else 0.0
+        print(f"Tool memo: {stats['calls']} calls, {stats['executed']} executed, {saved} collapsed ({share:.0%}): "
+              f"{stats['collapsed']} duplicates within a response, {stats['cache_hits']} cache hits, "
+              f"{stats['expired']} expired entries, {len(self.cache)} cached")
+
+
+MEMO = ToolMemo()
+
+
+if __name__ == "__main__":
+    from itertools import count
+    from types import SimpleNamespace
+
+    from tool_loop import execute_function_calls
+
+    call_ids = count(1)
+
+    def call(name, **arguments):
+        return SimpleNamespace(name=name, arguments=json.dumps(arguments), call_id=f"call_{next(call_ids)}")
+
+    # What a model typically asks for "weather, time and distance between New York and Paris"
+    first_response = [
+        call("get_weather", location="New York"),
+        call("get_weather", location="Paris"),
+        call("get_weather", location="new york ", unit="fahrenheit"),
+        call("get_time", location="New York"),
+        call("get_time", location="Paris"),
+        call("get_time", location="PARIS"),
+        call("calculate_distance", from_location="New York", to_location="Paris"),
+        call("calculate_distance", from_location="Paris", to_location="New York"),
+    ]
+    # A later round repeating some of the calls
+    second_response = [
+        call("get_weather", location="Paris"),
+        call("calculate_distance", from_location="paris", to_location="new york"),
+        call("get_weather", location="Tokyo"),
+    ]
+
+    for calls in (first_response, second_response):
+        for item in MEMO.execute(calls, execute_function_calls):
+            print(item["output"])
+    MEMO.report()
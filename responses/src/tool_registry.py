@@ -0,0 +1,189 @@
+"""
+Registry of function tools built from Python signatures.
+
+The Responses API tool definitions are generated once from the type hints and docstrings of the
+functions in custom_tools.py: the first docstring paragraph becomes the tool description, the
+"Args:" section the parameter descriptions, and Literal hints become enums. The generated tool
+list (and its JSON encoding) is cached, so examples pass the same objects on every request
+instead of copying hand-written schemas around.
+
+Each tool also gets an argument validator compiled from its signature. validate() parses
+function_call.arguments and checks required, unknown and mistyped arguments before the function
+is dispatched, raising ToolArgumentError with a message that can be returned to the model.
+"""
+
+import inspect
+import json
+import re
+import typing
+
+from custom_tools import calculate_distance, get_time, get_weather
+
+JSON_TYPES = {
+    str: ("string", (str,)),
+    int: ("integer", (int,)),
+    float: ("number", (int, float)),
+    bool: ("boolean", (bool,)),
+}
+
+
+class ToolArgumentError(ValueError):
+    """The arguments produced by the model do not match the tool signature."""
+
+
+def _parse_docstring(func):
+    doc = inspect.getdoc(func) or ""
+    sections = re.split(r"\n\s*Args:\s*\n", doc, maxsplit=1)
+    description = " ".join(sections[0].split()).rstrip(".")
+
+    arguments = {}
+    if len(sections) > 1:
+        name = None
+        for line in sections[1].splitlines():
+            match = re.match(r"\s*(\w+)(?:\s*\([^)]*\))?:\s*(.*)", line)
+            if match:
+                name, text = match.groups()
+                arguments[name] = text.strip()
+            elif name and line.strip():
+                arguments[name] += " " + line.strip()
+            elif not line.strip():
+                name = None
+    return description, arguments
+
+
+def _parameter_schema(hint, description):
+    """
+    JSON schema for one parameter plus what its validator checks: the accepted Python types and,
+    for Literal hints, the allowed values.
+    """
+    if typing.get_origin(hint) is typing.Literal:
+        choices = typing.get_args(hint)
+        json_type, accepted = JSON_TYPES[type(choices[0])]
+        schema = {"type": json_type, "enum": list(choices)}
+    else:
+        if hint not in JSON_TYPES:
+            raise TypeError(f"Unsupported parameter type for a function tool: {hint!r}")
+        json_type, accepted = JSON_TYPES[hint]
+        schema = {"type": json_type}
+        choices = None
+
+    if description:
+        schema["description"] = description
+    return schema, accepted, frozenset(choices) if choices else None
+
+
+def _compile_validator(name, checks, required):
+    """
+    Build a closure that validates parsed arguments with precomputed lookups only, so the
+    per-call cost is a JSON parse plus one dict/isinstance check per argument.
+    """
+    required = frozenset(required)
+    loads = json.loads
+
+    def validate(arguments):
+        try:
+            parsed = loads(arguments or "{}")
+        except json.JSONDecodeError as e:
+            raise ToolArgumentError(f"{name}: arguments are not valid JSON ({e})") from None
+        if type(parsed) is not dict:
+            raise ToolArgumentError(f"{name}: arguments must be a JSON object")
+
+        missing = required.difference(parsed)
+        if missing:
+            raise ToolArgumentError(f"{name}: missing required argument(s) {', '.join(sorted(missing))}")
+
+        for key, value in parsed.items():
+            check = checks.get(key)
+            if check is None:
+                raise ToolArgumentError(f"{name}: unexpected argument {key!r}")
+            accepted, choices = check
+            # bool is a subclass of int, but JSON true/false is not a number
+            if not isinstance(value, accepted) or (type(value) is bool and bool not in accepted):
+                raise ToolArgumentError(f"{name}: argument {key!r} has the wrong type")
+            if choices is not None and value not in choices:
+                raise ToolArgumentError(f"{name}: argument {key!r} must be one of {sorted(choices)}")
+        return parsed
+
+    return validate
+
+
+class ToolRegistry:
+    """
+    Function tools keyed by name, with their Responses API definitions and compiled validators.
+    """
+
+    def __init__(self, functions=()):
+        self.functions = {}
+        self.definitions = {}
+        self.validators = {}
+        self._tools = None
+        self._subsets = {}
+        self._json = {}
+        for func in functions:
+            self.register(func)
+
+    def register(self, func, name=None):
+        name = name or func.__name__
+        description, arg_docs = _parse_docstring(func)
+        hints = typing.get_type_hints(func)
+
+        properties = {}
+        checks = {}
+        required = []
+        for param in inspect.signature(func).parameters.values():
+            schema, accepted, choices = _parameter_schema(hints[param.name], arg_docs.get(param.name))
+            properties[param.name] = schema
+            checks[param.name] = (accepted, choices)
+            if param.default is inspect.Parameter.empty:
+                required.append(param.name)
+
+        self.functions[name] = func
+        self.definitions[name] = {
+            "type": "function",
+            "name": name,
+            "description": description,
+            "parameters": {"type": "object", "properties": properties, "required": required},
+        }
+        self.validators[name] = _compile_validator(name, checks, required)
+        self._tools = None
+        self._subsets.clear()
+        self._json.clear()
+        return func
+
+    @property
+    def tools(self):
+        """
+        Definitions of every registered tool, built once and reused across requests.
+        """
+        if self._tools is None:
+            self._tools = list(self.definitions.values())
+        return self._tools
+
+    def tools_for(self, *names):
+        """
+        Cached definitions of a subset of the registered tools.
+        """
+        if names not in self._subsets:
+            self._subsets[names] = [self.definitions[name] for name in names]
+        return self._subsets[names]
+
+    def tools_json(self, *names):
+        """
+        JSON encoding of tools_for(*names) (every tool when no names are given), for raw HTTP
+        requests.
+        """
+        if names not in self._json:
+            self._json[names] = json.dumps(self.tools_for(*names) if names else self.tools)
+        return self._json[names]
+
+    def validate(self, name, arguments):
+        """
+        Parse and check function_call.arguments for the named tool and return them as a dict.
+        """
+        validator = self.validators.get(name)
+        if validator is None:
+            raise ToolArgumentError(f"Unknown function: {name}")
+        return validator(arguments)
+
+
+REGISTRY = ToolRegistry([get_weather, get_time, calculate_distance])
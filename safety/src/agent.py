@@ -3,9 +3,11 @@
 # LLM output for harmful content using Llama Guard
 #
 
-from llama_stack_client import Agent, AgentEventLogger, LlamaStackClient
+from llama_stack_client import Agent, AgentEventLogger
 
-client = LlamaStackClient(base_url="http://localhost:8321")
+from stack_clients import get_llama_stack_client
+
+client = get_llama_stack_client(base_url="http://localhost:8321")
 
 # Get inference model id
 model_id = "ollama/llama3.2:3b"
@@ -0,0 +1,157 @@
+#
+# This sample code pre-screens a corpus of prompts with Llama Guard by fanning
+# run_shield calls out over a pooled async Llama Stack client
+#
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import statistics
+import time
+
+import httpx
+from llama_stack_client import AsyncLlamaStackClient
+
+BASE_URL = "http://localhost:8321"
+SHIELD_ID = "llama-guard3:1b"   # Get a registered safety shield
+
+
+def read_prompts(path, field):
+    '''
+    Stream (id, prompt) pairs from a JSONL or CSV file without loading the
+    whole corpus. Rows without an "id" column are keyed by their row number.
+    '''
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+
+        for row_number, row in enumerate(rows):
+            yield str(row.get("id", row_number)), row[field]
+
+
+def load_checkpoint(path):
+    '''
+    Return the ids of prompts already scanned by a previous (possibly
+    interrupted) run.
+    '''
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def percentile(cut_points, p):
+    return cut_points[p - 1] if cut_points else 0.0
+
+
+async def scan(client, shield_id, prompt):
+    started = time.perf_counter()
+    response = await client.safety.run_shield(
+        shield_id=shield_id,
+        messages=[{"role": "user", "content": prompt}],
+        params={},
+    )
+    return response, time.perf_counter() - started
+
+
+async def worker(client, args, queue, violations, checkpoint, latencies):
+    while True:
+        item = await queue.get()
+        if item is None:
+            queue.task_done()
+            return
+
+        prompt_id, prompt = item
+        try:
+            response, latency = await scan(client, args.shield_id, prompt)
+        except Exception as e:
+            # Leave the prompt out of the checkpoint so a rerun retries it
+            print(f"Error scanning prompt {prompt_id}: {e}")
+            queue.task_done()
+            continue
+
+        latencies.append(latency)
+        if response.violation:
+            # Llama Guard reports the violated categories as e.g. "S1,S9"
+            violation_type = response.violation.metadata.get("violation_type") or ""
+            violations.write(json.dumps({
+                "id": prompt_id,
+                "prompt": prompt,
+                "categories": [c for c in str(violation_type).split(",") if c],
+                "user_message": response.violation.user_message,
+            }) + "\n")
+            violations.flush()
+
+        checkpoint.write(prompt_id + "\n")
+        checkpoint.flush()
+        queue.task_done()
+
+
+async def bulk_scan(args):
+    checkpoint_path = args.output + ".checkpoint"
+    done = load_checkpoint(checkpoint_path)
+    if done:
+        print(f"Resuming: skipping {len(done)} prompts already scanned")
+
+    # One pooled connection per in-flight request, kept alive across calls
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=args.concurrency,
+            max_keepalive_connections=args.concurrency,
+        ),
+        timeout=httpx.Timeout(args.timeout),
+    )
+    client = AsyncLlamaStackClient(base_url=args.base_url, http_client=http_client)
+
+    latencies = []
+    queue = asyncio.Queue(maxsize=args.concurrency * 2)
+
+    with open(args.output, "a", encoding="utf-8") as violations, \
+            open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        workers = [
+            asyncio.create_task(worker(client, args, queue, violations, checkpoint, latencies))
+            for _ in range(args.concurrency)
+        ]
+
+        started = time.perf_counter()
+        for prompt_id, prompt in read_prompts(args.input, args.field):
+            if prompt_id not in done:
+                await queue.put((prompt_id, prompt))
+
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+        elapsed = time.perf_counter() - started
+
+    await client.close()
+
+    scanned = len(latencies)
+    print(f"Scanned {scanned} prompts in {elapsed:.2f}s "
+          f"({scanned / elapsed if elapsed else 0:.1f} prompts/s)")
+    if scanned > 1:
+        cut_points = statistics.quantiles(latencies, n=100, method="inclusive")
+        print(f"Latency p50={percentile(cut_points, 50) * 1000:.1f}ms "
+              f"p95={percentile(cut_points, 95) * 1000:.1f}ms "
+              f"p99={percentile(cut_points, 99) * 1000:.1f}ms")
+    print(f"Violations written to {args.output}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scan a prompt corpus with a Llama Stack shield")
+    parser.add_argument("input", help="JSONL or CSV file of prompts")
+    parser.add_argument("--output", default="violations.jsonl", help="JSONL file for violations")
+    parser.add_argument("--field", default="prompt", help="Column/key that holds the prompt text")
+    parser.add_argument("--shield-id", default=SHIELD_ID)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(bulk_scan(parse_args()))
@@ -2,9 +2,9 @@
 # This sample code scans user input for harmful content using Llama Guard
 #
 
-from llama_stack_client import LlamaStackClient
+from stack_clients import get_llama_stack_client
 
-client = LlamaStackClient(base_url="http://localhost:8321")
+client = get_llama_stack_client(base_url="http://localhost:8321")
 
 # Get a registered safety shield
 shield_id = "llama-guard3:1b"
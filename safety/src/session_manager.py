@@ -0,0 +1,242 @@
+#
+# This file provides a session manager that keeps a long-running, shielded
+# chat session within a token budget: recent turns are sent verbatim, older
+# ones are folded into a cached summary, and only the new turn is sent to
+# the shield
+#
+
+import argparse
+import hashlib
+import math
+import statistics
+import time
+
+from stack_clients import get_llama_stack_client, get_openai_client
+
+SUMMARY_PROMPT = (
+    "Update the summary of the conversation so far with the new exchanges below. "
+    "Keep names, facts, decisions and open questions; drop small talk. "
+    "Reply with the updated summary only."
+)
+
+
+def estimate_tokens(text):
+    '''
+    Rough token count (about four characters per token), good enough for
+    budgeting without loading the model's tokenizer.
+    '''
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+def _messages_hash(messages):
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(f"{message['role']}\x00{message['content']}\x00".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SessionManager:
+    '''
+    Client-side history for one shielded chat session.
+
+    The prompt for each turn is the instructions, the running summary of
+    folded turns and the most recent turns verbatim. When the verbatim turns
+    exceed token_budget, the oldest ones are folded into the summary until
+    they fit in low_water * token_budget; the gap between the two marks means
+    the summary is rewritten once every few turns rather than on every turn.
+    At least keep_recent turns always stay verbatim.
+
+    The shield sees the new turn instead of the whole history: the user
+    message before inference, and the reply together with the user message
+    that prompted it afterwards, since Llama Guard judges a response against
+    its request. Hashes of passed scans are kept, so a user message or a
+    (user, assistant) pair that was already scanned is not sent again.
+    Instructions and summaries are not shielded; summaries are written by
+    the model from messages that already passed.
+
+    token_budget=None and rescan=True give the unmanaged behaviour (full
+    history resent and rescanned every turn), which the benchmark below
+    uses as the baseline.
+    '''
+
+    def __init__(self, client, openai_client, model, shield_id, instructions="", token_budget=1024,
+                 low_water=0.5, keep_recent=4, summary_max_tokens=256, rescan=False):
+        self.client = client
+        self.openai_client = openai_client
+        self.model = model
+        self.shield_id = shield_id
+        self.instructions = instructions
+        self.token_budget = token_budget
+        self.low_water = low_water
+        self.keep_recent = keep_recent
+        self.summary_max_tokens = summary_max_tokens
+        self.rescan = rescan
+
+        self.summary = ""
+        self.turns = []             # [(user message, assistant message)] kept verbatim
+        self.turn_tokens = []       # estimated tokens of each verbatim turn
+        self.folded_turns = 0
+        self.scanned = set()
+        self.stats = {"summaries": 0, "summary_seconds": 0.0, "shield_calls": 0, "shield_skipped": 0}
+
+    def messages(self):
+        '''
+        The messages sent to the model before the next user message.
+        '''
+        messages = []
+        if self.instructions:
+            messages.append({"role": "system", "content": self.instructions})
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+        for user, assistant in self.turns:
+            messages.extend((user, assistant))
+        return messages
+
+    def shield(self, history, new):
+        '''
+        Run the shield over the new messages of a turn ([user] or [user,
+        assistant]), with the whole history in front when rescanning.
+        Returns the violation, or None when the new messages are safe.
+        '''
+        key = _messages_hash(new)
+        if self.rescan:
+            messages = history + new
+        elif key in self.scanned:
+            self.stats["shield_skipped"] += 1
+            return None
+        else:
+            messages = new
+
+        self.stats["shield_calls"] += 1
+        response = self.client.safety.run_shield(messages=messages, shield_id=self.shield_id, params={})
+        if response.violation is None:
+            self.scanned.add(key)
+        return response.violation
+
+    def turn(self, prompt, **kwargs):
+        '''
+        Send one user message and return the assistant's reply, or the
+        shield's message when the input or output is blocked. Extra keyword
+        arguments are passed to chat.completions.create.
+        '''
+        user = {"role": "user", "content": prompt}
+        history = self.messages()
+        violation = self.shield(history, [user])
+        if violation is not None:
+            return violation.user_message
+
+        completion = self.openai_client.chat.completions.create(
+            model=self.model, messages=history + [user], **kwargs
+        )
+        assistant = {"role": "assistant", "content": completion.choices[0].message.content or ""}
+
+        violation = self.shield(history, [user, assistant])
+        if violation is not None:
+            return violation.user_message
+
+        self.turns.append((user, assistant))
+        self.turn_tokens.append(estimate_tokens(prompt) + estimate_tokens(assistant["content"]))
+        self.compact()
+        return assistant["content"]
+
+    def compact(self):
+        '''
+        Fold the oldest verbatim turns into the summary once they exceed the
+        token budget.
+        '''
+        if self.token_budget is None or sum(self.turn_tokens) <= self.token_budget:
+            return
+
+        target = self.token_budget * self.low_water
+        fold = 0
+        remaining = sum(self.turn_tokens)
+        while remaining > target and len(self.turns) - fold > self.keep_recent:
+            remaining -= self.turn_tokens[fold]
+            fold += 1
+        if fold:
+            self._summarize(self.turns[:fold])
+            del self.turns[:fold]
+            del self.turn_tokens[:fold]
+            self.folded_turns += fold
+
+    def _summarize(self, turns):
+        # The previous summary is extended rather than rebuilt, so each
+        # update only processes the turns being folded
+        exchanges = "\n".join(f"User: {u['content']}\nAssistant: {a['content']}" for u, a in turns)
+        content = f"Current summary:\n{self.summary or '(empty)'}\n\nNew exchanges:\n{exchanges}"
+        started = time.perf_counter()
+        completion = self.openai_client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "system", "content": SUMMARY_PROMPT}, {"role": "user", "content": content}],
+            max_tokens=self.summary_max_tokens,
+            temperature=0,
+        )
+        self.summary = completion.choices[0].message.content or self.summary
+        self.stats["summaries"] += 1
+        self.stats["summary_seconds"] += time.perf_counter() - started
+
+    def prompt_tokens(self):
+        return sum(estimate_tokens(m["content"]) for m in self.messages())
+
+
+def run_session(session, turns, prompts):
+    latencies = []
+    prompt_tokens = []
+    for i in range(turns):
+        prompt_tokens.append(session.prompt_tokens())
+        started = time.perf_counter()
+        session.turn(f"{prompts[i % len(prompts)]} (question {i + 1})", max_tokens=64)
+        latencies.append(time.perf_counter() - started)
+    return latencies, prompt_tokens
+
+
+def print_buckets(label, latencies, prompt_tokens, bucket):
+    print(f"\n{label}")
+    print(f"{'turns':<12}{'mean ms':>10}{'p95 ms':>10}{'history tokens':>16}")
+    for start in range(0, len(latencies), bucket):
+        chunk = sorted(latencies[start:start + bucket])
+        p95 = chunk[min(len(chunk) - 1, int(len(chunk) * 0.95))]
+        print(f"{f'{start + 1}-{start + len(chunk)}':<12}{statistics.fmean(chunk) * 1000:>10.1f}"
+              f"{p95 * 1000:>10.1f}{statistics.fmean(prompt_tokens[start:start + bucket]):>16.0f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare full-history and token-budgeted shielded sessions")
+    parser.add_argument("--base-url", default="http://localhost:8321")
+    parser.add_argument("--model", default="ollama/llama3.2:3b")
+    parser.add_argument("--turns", type=int, default=120)
+    parser.add_argument("--token-budget", type=int, default=1024, help="Tokens of verbatim history per session")
+    parser.add_argument("--keep-recent", type=int, default=4, help="Turns that are never summarized")
+    parser.add_argument("--bucket", type=int, default=20, help="Turns per row of the latency table")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    client = get_llama_stack_client(base_url=args.base_url)
+    openai_client = get_openai_client(base_url=args.base_url + "/v1/openai/v1")
+    shield_id = client.shields.list()[0].identifier
+
+    sample_prompts = [
+        "Which players played in the winning team of the NBA eastern conference semifinals of 2024?",
+        "Who was the top scorer in that series?",
+        "How did the team do in the finals?",
+        "Summarize the season for a newsletter.",
+    ]
+
+    results = {}
+    for label, budget, rescan in (("Full history, rescanned every turn", None, True),
+                                  (f"Managed session, {args.token_budget} token budget", args.token_budget, False)):
+        session = SessionManager(client, openai_client, args.model, shield_id, token_budget=budget,
+                                 keep_recent=args.keep_recent, rescan=rescan)
+        latencies, prompt_tokens = run_session(session, args.turns, sample_prompts)
+        print_buckets(label, latencies, prompt_tokens, args.bucket)
+        print(f"shield calls={session.stats['shield_calls']} skipped={session.stats['shield_skipped']}, "
+              f"summaries={session.stats['summaries']} ({session.stats['summary_seconds'] * 1000:.0f}ms), "
+              f"turns folded={session.folded_turns}")
+        results[label] = latencies
+
+    (full, managed) = results.values()
+    tail = max(1, args.bucket)
+    print(f"\nLast {tail} turns: full history {statistics.fmean(full[-tail:]) * 1000:.1f}ms, "
+          f"managed {statistics.fmean(managed[-tail:]) * 1000:.1f}ms per turn")
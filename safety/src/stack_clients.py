@@ -0,0 +1,87 @@
+#
+# This file provides process-wide Llama Stack and OpenAI clients that share
+# one keep-alive connection pool instead of opening a new one per client.
+# It is the same pooling as responses/src/openai_clients.py, cut down to what
+# differs here: Llama Stack clients, local defaults and no cassettes
+#
+
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+from llama_stack_client import AsyncLlamaStackClient, LlamaStackClient
+from openai import AsyncOpenAI, OpenAI
+
+BASE_URL = "http://localhost:8321"
+OPENAI_BASE_URL = BASE_URL + "/v1/openai/v1"
+TIMEOUT = httpx.Timeout(timeout=60, connect=5.0)
+LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+
+_lock = threading.Lock()
+_pool = None                                # (httpx.Client, clients by key)
+_async_pools = weakref.WeakKeyDictionary()  # event loop -> (httpx.AsyncClient, clients by key)
+
+
+def _http2_enabled():
+    '''
+    HTTP/2 is opt-in with STACK_CLIENT_HTTP2=1 and needs the optional h2 package.
+    '''
+    if os.getenv("STACK_CLIENT_HTTP2", "").strip() not in ("1", "true"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        print("STACK_CLIENT_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _pooled(client_class, base_url, api_key, loop=None):
+    global _pool
+    key = (client_class.__name__, base_url, api_key)
+    with _lock:
+        pool = _pool if loop is None else _async_pools.get(loop)
+        if pool is None:
+            http_class = httpx.Client if loop is None else httpx.AsyncClient
+            pool = (http_class(timeout=TIMEOUT, limits=LIMITS, http2=_http2_enabled(), follow_redirects=True), {})
+            if loop is None:
+                _pool = pool
+            else:
+                _async_pools[loop] = pool
+        http_client, clients = pool
+        if key not in clients:
+            clients[key] = client_class(base_url=base_url, api_key=api_key, http_client=http_client)
+        return clients[key]
+
+
+def get_llama_stack_client(base_url=BASE_URL, api_key=None):
+    '''
+    Shared LlamaStackClient for base_url/api_key. Callers must not close it.
+    '''
+    return _pooled(LlamaStackClient, base_url, api_key)
+
+
+def get_openai_client(base_url=OPENAI_BASE_URL, api_key="some_random_key"):
+    '''
+    Shared OpenAI client for the OpenAI-compatible Llama Stack endpoints,
+    such as moderations. Callers must not close it.
+    '''
+    return _pooled(OpenAI, base_url, api_key)
+
+
+def get_async_llama_stack_client(base_url=BASE_URL, api_key=None):
+    '''
+    Shared AsyncLlamaStackClient for base_url/api_key within the running
+    event loop.
+    '''
+    return _pooled(AsyncLlamaStackClient, base_url, api_key, asyncio.get_running_loop())
+
+
+def get_async_openai_client(base_url=OPENAI_BASE_URL, api_key="some_random_key"):
+    '''
+    Shared AsyncOpenAI client for base_url/api_key within the running event
+    loop.
+    '''
+    return _pooled(AsyncOpenAI, base_url, api_key, asyncio.get_running_loop())